@@ -0,0 +1,64 @@
+"""add passport_last4 / tsa_last4 to users so profile reads skip decryption
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+from cryptography.fernet import Fernet
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def _last4(value: str | None) -> str | None:
+    # Must match profile._last4: values of 4 chars or fewer are fully masked
+    if not value:
+        return None
+    return value[-4:] if len(value) > 4 else ""
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("passport_last4", sa.String(4), nullable=True))
+    op.add_column("users", sa.Column("tsa_last4", sa.String(4), nullable=True))
+
+    # Backfill from the encrypted columns so existing profiles keep their masks
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, passport_number_enc, tsa_known_traveler_enc FROM users "
+            "WHERE passport_number_enc IS NOT NULL OR tsa_known_traveler_enc IS NOT NULL"
+        )
+    ).fetchall()
+    if not rows:
+        return
+
+    # Decrypts locally rather than through app.encryption: at this revision the
+    # columns hold Fernet tokens as text, whatever that module expects later.
+    # The key comes from settings (as env.py does) so a .env-only setup works.
+    from app.config import settings
+
+    fernet = Fernet(settings.encryption_key.encode())
+
+    def decrypt(value: str | None) -> str | None:
+        if not value:
+            return None
+        return fernet.decrypt(value.encode()).decode()
+
+    for row in rows:
+        conn.execute(
+            sa.text("UPDATE users SET passport_last4 = :p, tsa_last4 = :t WHERE id = :id"),
+            {
+                "id": row.id,
+                "p": _last4(decrypt(row.passport_number_enc)),
+                "t": _last4(decrypt(row.tsa_known_traveler_enc)),
+            },
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "tsa_last4")
+    op.drop_column("users", "passport_last4")
@@ -0,0 +1,32 @@
+"""store Fernet-encrypted user fields as bytea instead of text
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = ("passport_number_enc", "tsa_known_traveler_enc")
+
+
+def upgrade() -> None:
+    # Fernet tokens are URL-safe base64 (ASCII), so the byte-for-byte
+    # conversion is lossless and existing tokens still decrypt
+    for column in _COLUMNS:
+        op.execute(
+            f"ALTER TABLE users ALTER COLUMN {column} TYPE bytea "
+            f"USING convert_to({column}, 'UTF8')"
+        )
+
+
+def downgrade() -> None:
+    for column in _COLUMNS:
+        op.execute(
+            f"ALTER TABLE users ALTER COLUMN {column} TYPE varchar "
+            f"USING convert_from({column}, 'UTF8')"
+        )
@@ -0,0 +1,35 @@
+"""replace ix_users_email with a covering index for profile reads
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+# Must match the narrow SELECT in routers/profile.py so GET /profile is an
+# index-only scan with no heap fetch
+_INCLUDE = (
+    "first_name, last_name, date_of_birth, phone, seat_preference, "
+    "meal_preference, passport_last4, tsa_last4, loyalty_numbers"
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_covering "
+            f"ON users (email) INCLUDE ({_INCLUDE})"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email ON users (email)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_covering")
@@ -0,0 +1,24 @@
+"""add agent_logs.screenshot_png (zstd-compressed PNG bytes)
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-15
+
+screenshot_b64 is kept so rows written before this change stay readable during
+rollout; new rows only populate screenshot_png.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("agent_logs", sa.Column("screenshot_png", sa.LargeBinary, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("agent_logs", "screenshot_png")
@@ -0,0 +1,40 @@
+"""agent_logs: BRIN on created_at, composite (booking_id, created_at) btree
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-15
+
+agent_logs is append-only, so created_at tracks physical row order and a BRIN
+index covers time-window scans at a fraction of a btree's size. The composite
+btree replaces ix_agent_logs_booking_id and returns a booking's logs already in
+created_at order, as Booking.agent_logs is declared.
+"""
+from alembic import op
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_agent_logs_created_at_brin "
+            "ON agent_logs USING BRIN (created_at) WITH (pages_per_range = 32)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_agent_logs_booking_id_created_at "
+            "ON agent_logs (booking_id, created_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_agent_logs_booking_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_agent_logs_booking_id "
+            "ON agent_logs (booking_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_agent_logs_booking_id_created_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_agent_logs_created_at_brin")
@@ -0,0 +1,143 @@
+"""partition agent_logs by month on created_at
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-15
+
+agent_logs becomes a RANGE-partitioned table with one partition per month
+(agent_logs_YYYY_MM) plus a default partition. Inserts land in the small
+current partition, and old months can be detached/dropped instead of DELETEd.
+The primary key becomes (id, created_at) since Postgres requires the partition
+key in every unique constraint; the FK to bookings lives on the parent.
+
+Partitions are created by the ensure_agent_logs_partition(date) SQL function
+defined here. Beat calls it daily (app.tasks.maintenance_tasks) to keep next
+month's partition ahead of the inserts.
+"""
+from alembic import op
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    "id, booking_id, step, action, result, screenshot_png, screenshot_b64, "
+    "error_message, created_at"
+)
+
+_ENSURE_PARTITION_FN = """
+CREATE OR REPLACE FUNCTION ensure_agent_logs_partition(for_date date)
+RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+    start_month date := date_trunc('month', for_date)::date;
+    part_name text := 'agent_logs_' || to_char(start_month, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF agent_logs '
+        'FOR VALUES FROM (%L) TO (%L)',
+        part_name, start_month, (start_month + interval '1 month')::date
+    );
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE agent_logs RENAME TO agent_logs_unpartitioned")
+    op.execute("ALTER TABLE agent_logs_unpartitioned RENAME CONSTRAINT agent_logs_pkey TO agent_logs_unpartitioned_pkey")
+    op.execute(
+        "ALTER TABLE agent_logs_unpartitioned "
+        "RENAME CONSTRAINT agent_logs_booking_id_fkey TO agent_logs_unpartitioned_booking_id_fkey"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_agent_logs_booking_id_created_at")
+    op.execute("DROP INDEX IF EXISTS ix_agent_logs_created_at_brin")
+
+    op.execute(
+        """
+        CREATE TABLE agent_logs (
+            id uuid NOT NULL DEFAULT gen_random_uuid(),
+            booking_id uuid NOT NULL REFERENCES bookings (id),
+            step varchar(100) NOT NULL,
+            action text NOT NULL,
+            result varchar(20) NOT NULL,
+            screenshot_png bytea,
+            screenshot_b64 text,
+            error_message text,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT agent_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE TABLE agent_logs_default PARTITION OF agent_logs DEFAULT")
+    op.execute(_ENSURE_PARTITION_FN)
+
+    # One partition per month from the oldest existing row through next month
+    op.execute(
+        """
+        SELECT ensure_agent_logs_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', LEAST(
+                (SELECT min(created_at) FROM agent_logs_unpartitioned), now()
+            )),
+            date_trunc('month', now()) + interval '1 month',
+            interval '1 month'
+        ) AS month
+        """
+    )
+
+    # Indexes on the parent cascade to every partition, current and future
+    op.execute(
+        "CREATE INDEX ix_agent_logs_booking_id_created_at "
+        "ON agent_logs (booking_id, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX ix_agent_logs_created_at_brin "
+        "ON agent_logs USING BRIN (created_at) WITH (pages_per_range = 32)"
+    )
+
+    op.execute(
+        f"INSERT INTO agent_logs ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM agent_logs_unpartitioned"
+    )
+    op.execute("DROP TABLE agent_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE agent_logs RENAME TO agent_logs_partitioned")
+    op.execute("ALTER TABLE agent_logs_partitioned RENAME CONSTRAINT agent_logs_pkey TO agent_logs_partitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_agent_logs_booking_id_created_at")
+    op.execute("DROP INDEX IF EXISTS ix_agent_logs_created_at_brin")
+
+    op.execute(
+        """
+        CREATE TABLE agent_logs (
+            id uuid NOT NULL DEFAULT gen_random_uuid(),
+            booking_id uuid NOT NULL,
+            step varchar(100) NOT NULL,
+            action text NOT NULL,
+            result varchar(20) NOT NULL,
+            screenshot_png bytea,
+            screenshot_b64 text,
+            error_message text,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT agent_logs_pkey PRIMARY KEY (id),
+            CONSTRAINT agent_logs_booking_id_fkey FOREIGN KEY (booking_id) REFERENCES bookings (id)
+        )
+        """
+    )
+    op.execute(
+        f"INSERT INTO agent_logs ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM agent_logs_partitioned"
+    )
+    op.execute("DROP TABLE agent_logs_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_agent_logs_partition(date)")
+
+    op.execute(
+        "CREATE INDEX ix_agent_logs_booking_id_created_at "
+        "ON agent_logs (booking_id, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX ix_agent_logs_created_at_brin "
+        "ON agent_logs USING BRIN (created_at) WITH (pages_per_range = 32)"
+    )
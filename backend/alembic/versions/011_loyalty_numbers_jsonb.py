@@ -0,0 +1,36 @@
+"""users.loyalty_numbers: json → jsonb with a GIN index
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-15
+
+jsonb is stored pre-parsed and supports containment lookups such as
+loyalty_numbers @> '[{"program": "Marriott"}]', served by the GIN index.
+jsonb_path_ops keeps the index small and only supports @>, which is the only
+operator we need.
+"""
+from alembic import op
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN loyalty_numbers TYPE jsonb "
+        "USING loyalty_numbers::jsonb"
+    )
+    op.execute(
+        "CREATE INDEX ix_users_loyalty_gin ON users "
+        "USING GIN (loyalty_numbers jsonb_path_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_loyalty_gin")
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN loyalty_numbers TYPE json "
+        "USING loyalty_numbers::json"
+    )
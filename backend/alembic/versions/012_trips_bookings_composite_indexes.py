@@ -0,0 +1,40 @@
+"""trips (user_id, created_at DESC) and bookings (trip_id, created_at) indexes
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-15
+
+list_trips filters on user_id and orders by created_at DESC; list_bookings
+filters on trip_id and orders by created_at. The composite btrees return rows
+already in that order, so both become index scans with no sort step. Their
+leading columns still serve the FK lookups, so they replace ix_trips_user_id
+and ix_bookings_trip_id.
+"""
+from alembic import op
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trips_user_created "
+            "ON trips (user_id, created_at DESC)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bookings_trip_created "
+            "ON bookings (trip_id, created_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_trips_user_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_bookings_trip_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trips_user_id ON trips (user_id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bookings_trip_id ON bookings (trip_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_bookings_trip_created")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_trips_user_created")
@@ -0,0 +1,28 @@
+"""add trips.options_count
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-15
+
+Lets approve_trip validate option_index without loading itinerary_options.
+Existing rows are backfilled from the stored JSON array.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("trips", sa.Column("options_count", sa.Integer, nullable=True))
+    op.execute(
+        "UPDATE trips SET options_count = json_array_length(itinerary_options) "
+        "WHERE json_typeof(itinerary_options) = 'array'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("trips", "options_count")
@@ -0,0 +1,30 @@
+"""add bookings.priority and bookings.batch_id
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-15
+
+priority selects how the booking agent calls Claude: "interactive" (Messages
+API) or "batch" (Message Batches API). batch_id records the agent's most
+recent in-flight Message Batch so it can be looked up after a worker crash.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "bookings",
+        sa.Column("priority", sa.String(20), nullable=False, server_default="interactive"),
+    )
+    op.add_column("bookings", sa.Column("batch_id", sa.String, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("bookings", "batch_id")
+    op.drop_column("bookings", "priority")
@@ -0,0 +1,51 @@
+"""agent_logs: add screenshot_url, drop legacy screenshot_b64
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-15
+
+With SCREENSHOT_BUCKET set, screenshots live in object storage and the row
+only keeps the s3:// URL. Legacy screenshot_b64 values are converted to the
+zstd-compressed screenshot_png format (see services/screenshot_store.py)
+before the column is dropped; downgrade re-adds the column empty.
+"""
+import base64
+
+import sqlalchemy as sa
+import zstandard
+from alembic import op
+
+revision = "015"
+down_revision = "014"
+branch_labels = None
+depends_on = None
+
+_BATCH = 500
+
+
+def upgrade() -> None:
+    op.add_column("agent_logs", sa.Column("screenshot_url", sa.String, nullable=True))
+
+    conn = op.get_bind()
+    compressor = zstandard.ZstdCompressor(level=3)
+    # Server-side cursor: legacy screenshots are streamed, not loaded at once
+    rows = conn.execute(sa.text(
+        "SELECT id, created_at, screenshot_b64 FROM agent_logs "
+        "WHERE screenshot_b64 IS NOT NULL AND screenshot_png IS NULL"
+    ).execution_options(stream_results=True))
+    update = sa.text(
+        "UPDATE agent_logs SET screenshot_png = :png WHERE id = :id AND created_at = :created_at"
+    ).bindparams(sa.bindparam("png", type_=sa.LargeBinary))
+    while batch := rows.fetchmany(_BATCH):
+        conn.execute(update, [
+            {"id": r.id, "created_at": r.created_at,
+             "png": compressor.compress(base64.b64decode(r.screenshot_b64))}
+            for r in batch
+        ])
+
+    op.drop_column("agent_logs", "screenshot_b64")
+
+
+def downgrade() -> None:
+    op.add_column("agent_logs", sa.Column("screenshot_b64", sa.Text, nullable=True))
+    op.drop_column("agent_logs", "screenshot_url")
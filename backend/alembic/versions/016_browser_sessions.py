@@ -0,0 +1,31 @@
+"""create browser_sessions table
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-15
+
+Per-user, per-site Playwright storage state, so the live booking agent starts
+repeat bookings with cookie banners dismissed and loyalty logins in place.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "016"
+down_revision = "015"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "browser_sessions",
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("site", sa.String(255), primary_key=True),
+        sa.Column("storage_state_enc", sa.LargeBinary, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("browser_sessions")
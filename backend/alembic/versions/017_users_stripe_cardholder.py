@@ -0,0 +1,24 @@
+"""add users.stripe_cardholder_id
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-15
+
+The user's Stripe Issuing cardholder, saved on first use so later bookings
+create their virtual cards without a Cardholder.list round-trip.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "017"
+down_revision = "016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("stripe_cardholder_id", sa.String, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "stripe_cardholder_id")
@@ -0,0 +1,45 @@
+"""narrow ix_users_email_covering: non-unique, without loyalty_numbers
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-15
+
+loyalty_numbers is an unbounded jsonb array; carried in the INCLUDE list it
+can push an index tuple past the btree row-size limit and fail the profile
+upsert. The index also doesn't need to be unique — users_email_key already
+enforces that (and is what ON CONFLICT (email) uses), so writes were
+maintaining two unique btrees on email.
+"""
+from alembic import op
+
+revision = "018"
+down_revision = "017"
+branch_labels = None
+depends_on = None
+
+_INCLUDE = (
+    "first_name, last_name, date_of_birth, phone, seat_preference, "
+    "meal_preference, passport_last4, tsa_last4"
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction. Build the replacement under
+    # a temporary name first so profile reads are never without an index.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_covering_new "
+            f"ON users (email) INCLUDE ({_INCLUDE})"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_covering")
+        op.execute("ALTER INDEX ix_users_email_covering_new RENAME TO ix_users_email_covering")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_covering_old "
+            f"ON users (email) INCLUDE ({_INCLUDE}, loyalty_numbers)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_covering")
+        op.execute("ALTER INDEX ix_users_email_covering_old RENAME TO ix_users_email_covering")
@@ -1,14 +1,25 @@
-from fastapi import Header, HTTPException, status
+import hmac
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.config import settings
+from app.database import get_db
+from app.models import User
+
+# Encoded once; compared in constant time so the key can't be recovered by timing
+_INTERNAL_KEY = settings.internal_api_key.encode()
 
 
-def require_internal_key(x_api_key: str = Header(...)) -> str:
+def require_internal_key(x_api_key: str = Header(..., max_length=128)) -> str:
     """
     FastAPI dependency — verifies the shared internal API key.
     The Next.js backend injects this header on every server-to-server call.
     FastAPI should never be directly exposed to the public internet.
     """
-    if x_api_key != settings.internal_api_key:
+    if not hmac.compare_digest(x_api_key.encode(), _INTERNAL_KEY):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API key",
@@ -16,14 +27,26 @@ def require_internal_key(x_api_key: str = Header(...)) -> str:
     return x_api_key
 
 
-def get_current_user_email(x_user_email: str = Header(...)) -> str:
+def get_current_user_email(
+    x_user_email: str = Header(..., min_length=3, max_length=320),
+) -> str:
     """
     FastAPI dependency — extracts the authenticated user's email from the
     header injected by the Next.js API route after verifying the session.
+    Missing, empty, or oversize values are rejected (422) by header validation.
     """
-    if not x_user_email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing user email header",
-        )
     return x_user_email
+
+
+async def get_current_user(
+    email: str = Depends(get_current_user_email),
+    _key: str = Depends(require_internal_key),
+    db: AsyncSession = Depends(get_db),
+) -> Optional[User]:
+    """
+    FastAPI dependency — resolves the authenticated email to its User row, or
+    None if the user has no profile yet. FastAPI caches dependencies per
+    request, so the lookup runs once and shares the route's DB session. The
+    API key is checked first so unauthenticated calls never reach the DB.
+    """
+    return (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
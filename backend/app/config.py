@@ -6,6 +6,14 @@ class Settings(BaseSettings):
     internal_api_key: str
     encryption_key: str
 
+    # SQLAlchemy connection pool — tune per environment. pool_size + max_overflow
+    # is the most connections one process will hold open against Postgres.
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    # Recycle connections before Postgres idle timeouts close them server-side
+    db_pool_recycle: int = 1800
+    db_pool_timeout: int = 10
+
     # Amadeus API — get sandbox keys at https://developers.amadeus.com
     # Leave empty to run in mock mode (realistic sample data, no real API calls)
     amadeus_client_id: str = ""
@@ -22,18 +30,38 @@ class Settings(BaseSettings):
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
 
+    # Redis cache for Amadeus search responses (separate DB from Celery).
+    # Leave empty to disable caching — every search hits the API.
+    cache_redis_url: str = ""
+
     # Stripe Issuing — single-use virtual cards per booking
     # Leave empty to use mock card data (no real Stripe calls)
     stripe_secret_key: str = ""
+    # Issuing calls go over a shared async HTTP client; set true to fall back to
+    # the stripe SDK (blocking, run in a worker thread)
+    stripe_use_sdk: bool = False
 
     # Browserless.io — scalable headless Chrome
     # Leave empty to launch a local Playwright browser instead
     browserless_url: str = ""
 
+    # S3-compatible bucket for booking agent screenshots (credentials from the
+    # standard AWS_* env vars). Leave empty to store them in Postgres instead.
+    screenshot_bucket: str = ""
+    # Custom endpoint for S3-compatible stores such as MinIO; empty for AWS S3
+    screenshot_s3_endpoint_url: str = ""
+
+    # Live-mode bookings share one browser; each holds its own context.
+    # Caps how many contexts (concurrent bookings) are open at once per worker.
+    max_concurrent_bookings: int = 4
+
     # When true (default), the booking agent simulates steps without a real
     # browser. Set to false only after Playwright is installed and you have
     # live site access.
     booking_mock_mode: bool = True
+    # Simulated time per mock booking step, so the demo UI shows live progress.
+    # Set to 0 for tests/CI — a mock booking then completes in milliseconds.
+    mock_step_delay_s: float = 1.2
 
     # SendGrid — transactional email for booking confirmations
     # Leave empty to skip email delivery (best-effort, no error raised)
@@ -1,18 +1,42 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine_kwargs = dict(
+    # Compiled-SQL cache per engine; the app has a fixed set of statement
+    # shapes, so a larger cache means every query after warm-up skips compilation
+    query_cache_size=1200,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,
+    # Issue a lightweight ping on checkout so connections dropped by a Postgres
+    # restart are replaced instead of surfacing as request errors
+    pool_pre_ping=True,
+)
+
+# Sync engine — used by Celery tasks
+engine = create_engine(settings.database_url, **_engine_kwargs)
+# expire_on_commit=False: objects keep the values we just wrote after commit, so
+# reading them back (responses, the booking agent's per-step commits) doesn't
+# trigger a reload SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine (asyncpg) — used by the FastAPI handlers so DB round-trips never
+# block the event loop or tie up a threadpool worker. asyncpg also keeps a
+# per-connection cache of server-side prepared statements.
+async_engine = create_async_engine(
+    settings.database_url.replace("postgresql://", "postgresql+asyncpg://", 1),
+    **_engine_kwargs,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -3,16 +3,43 @@ from app.config import settings
 
 _fernet = Fernet(settings.encryption_key.encode())
 
+# Pre-bound so the hot path skips the attribute lookup on every call
+_encrypt = _fernet.encrypt
+_decrypt = _fernet.decrypt
 
-def encrypt(value: str | None) -> str | None:
-    """Encrypt a plain-text string. Returns None if value is None or empty."""
+
+def encrypt_bytes(raw: bytes) -> bytes:
+    """Encrypt raw bytes into a Fernet token."""
+    return _encrypt(raw)
+
+
+def decrypt_bytes(token: bytes) -> bytes:
+    """Decrypt a Fernet token back into raw bytes."""
+    return _decrypt(token)
+
+
+def encrypt(value: str | None) -> bytes | None:
+    """
+    Encrypt a plain-text string. Returns the Fernet token as bytes (stored as
+    BYTEA, so there is no text round-trip), or None if value is None or empty.
+    """
     if not value:
         return None
-    return _fernet.encrypt(value.encode()).decode()
+    return _encrypt(value.encode())
 
 
-def decrypt(value: str | None) -> str | None:
-    """Decrypt a Fernet-encrypted string. Returns None if value is None or empty."""
+def decrypt(value: bytes | None) -> str | None:
+    """Decrypt a Fernet token (bytes from a BYTEA column). Returns None if value is None or empty."""
     if not value:
         return None
-    return _fernet.decrypt(value.encode()).decode()
+    return _decrypt(value).decode()
+
+
+def encrypt_batch(values: list[str | None]) -> list[bytes | None]:
+    """Encrypt several values with the shared Fernet instance; None/empty stay None."""
+    return [encrypt(v) for v in values]
+
+
+def decrypt_batch(values: list[bytes | None]) -> list[str | None]:
+    """Decrypt several Fernet tokens with the shared Fernet instance; None/empty stay None."""
+    return [decrypt(v) for v in values]
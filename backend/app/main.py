@@ -1,16 +1,59 @@
+import logging
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.routers import profile, trips
+from app.services import amadeus, cache
+
+
+def _start_log_listener() -> QueueListener:
+    """
+    Route root logging through a queue so handler I/O (stderr writes, etc.)
+    happens on the listener's background thread, never on the event loop.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.handlers = [QueueHandler(log_queue)]
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
 
-app = FastAPI(title="Travel Planner API", version="0.3.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = _start_log_listener()
+    yield
+    # Drain the shared Amadeus and Redis cache connection pools on shutdown
+    await amadeus.close_client()
+    await cache.close()
+    # Flush queued records and hand the original handlers back to the root logger
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
+
+# orjson serializes response bodies several times faster than stdlib json
+app = FastAPI(
+    title="Travel Planner API",
+    version="0.3.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
-# Only allow requests from the Next.js server (not the browser directly)
+# Only allow requests from the Next.js server (not the browser directly).
+# CORSMiddleware is pure ASGI and checks a literal origin list by membership
+# (no regex unless allow_origin_regex is set). Explicit methods/headers keep
+# preflight responses fixed instead of reflecting the request's headers.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "X-API-Key", "X-User-Email"],
 )
 
 app.include_router(profile.router)
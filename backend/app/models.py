@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Boolean, LargeBinary, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import uuid
 from app.database import Base
@@ -10,7 +10,7 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    email = Column(String(255), unique=True, nullable=False)
 
     # Personal info — needed by the booking agent to fill passenger forms
     first_name = Column(String(100), nullable=True)
@@ -18,28 +18,61 @@ class User(Base):
     date_of_birth = Column(String(10), nullable=True)  # YYYY-MM-DD, plaintext
     phone = Column(String(30), nullable=True)
 
-    # Encrypted at the application layer using Fernet before writing to DB
-    passport_number_enc = Column(String, nullable=True)
-    tsa_known_traveler_enc = Column(String, nullable=True)
+    # Encrypted at the application layer using Fernet before writing to DB;
+    # the token is kept as raw bytes so there is no str encode/decode per read
+    passport_number_enc = Column(LargeBinary, nullable=True)
+    tsa_known_traveler_enc = Column(LargeBinary, nullable=True)
+    # Last 4 chars of each, written alongside the ciphertext so profile reads
+    # can show a masked value without decrypting. "" = value too short to show.
+    passport_last4 = Column(String(4), nullable=True)
+    tsa_last4 = Column(String(4), nullable=True)
 
     # Plain-text preferences — not sensitive
     seat_preference = Column(String(50), nullable=True)
     meal_preference = Column(String(50), nullable=True)
 
-    # JSON array of {program: str, number: str}
-    loyalty_numbers = Column(JSON, nullable=True, default=list)
+    # JSONB array of {program: str, number: str}; GIN-indexed for @> lookups
+    loyalty_numbers = Column(JSONB, nullable=True, default=list)
+
+    # Stripe Issuing cardholder for this user's virtual cards, saved after the
+    # first booking so later ones skip the Cardholder lookup
+    stripe_cardholder_id = Column(String, nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Left lazy: most User loads are auth/profile lookups that never touch trips.
+    # Use selectinload() at query time where a trip tree is actually rendered.
     trips = relationship("Trip", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Carries the fixed-size profile columns so the profile lookup reads them
+        # from the index (migrations 007, 018). Not unique — the email column's
+        # own constraint covers that — and loyalty_numbers stays out: an
+        # unbounded jsonb array can exceed the btree row-size limit.
+        Index(
+            "ix_users_email_covering",
+            "email",
+            postgresql_include=[
+                "first_name", "last_name", "date_of_birth", "phone",
+                "seat_preference", "meal_preference",
+                "passport_last4", "tsa_last4",
+            ],
+        ),
+        Index(
+            "ix_users_loyalty_gin",
+            "loyalty_numbers",
+            postgresql_using="gin",
+            postgresql_ops={"loyalty_numbers": "jsonb_path_ops"},
+        ),
+    )
+
 
 class Trip(Base):
     __tablename__ = "trips"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     # Status flow: parsing → searching → options_ready → approved →
     #              booking → confirmed | booking_failed | failed
@@ -53,6 +86,8 @@ class Trip(Base):
 
     # List of 2-3 itinerary option objects built by the itinerary service
     itinerary_options = Column(JSON, nullable=True)
+    # len(itinerary_options), so approve_trip can validate without loading the JSON
+    options_count = Column(Integer, nullable=True)
 
     # The specific option the user approved
     approved_itinerary = Column(JSON, nullable=True)
@@ -61,16 +96,26 @@ class Trip(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     user = relationship("User", back_populates="trips")
+    # Left lazy so trip lists don't pull every booking (and, via selectin, its logs)
     bookings = relationship("Booking", back_populates="trip", cascade="all, delete-orphan")
     alerts = relationship("TripAlert", back_populates="trip", cascade="all, delete-orphan",
                           order_by="TripAlert.created_at.desc()")
 
+    # Fetch server-generated created_at/updated_at via RETURNING on INSERT and
+    # UPDATE, so the response can read them without a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        # Serves list_trips (user_id filter, newest first) without a sort step
+        Index("ix_trips_user_created", "user_id", created_at.desc()),
+    )
+
 
 class Booking(Base):
     __tablename__ = "bookings"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id"), nullable=False, index=True)
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id"), nullable=False)
 
     type = Column(String(50), nullable=False)   # flight | hotel | activity
     # pending → in_progress → confirmed | failed | unsupported
@@ -82,20 +127,33 @@ class Booking(Base):
     # Stripe Issuing card ID — kept so we can void the card if booking fails
     virtual_card_id = Column(String, nullable=True)
 
+    # "interactive" (Messages API) | "batch" (Message Batches API, half price,
+    # results within 24h) — how the live-mode agent calls Claude
+    priority = Column(String(20), nullable=False, default="interactive", server_default="interactive")
+    # Most recent Message Batch submitted for a batch-priority booking
+    batch_id = Column(String, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     trip = relationship("Trip", back_populates="bookings")
+    # Left lazy: the booking task and the approve/confirmation paths never read
+    # logs. list_bookings batch-loads them with selectinload() at query time.
     agent_logs = relationship("AgentLog", back_populates="booking", cascade="all, delete-orphan",
                               order_by="AgentLog.created_at")
 
+    __table_args__ = (
+        # Serves list_bookings (trip_id filter, created_at order) without a sort step
+        Index("ix_bookings_trip_created", "trip_id", "created_at"),
+    )
+
 
 class AgentLog(Base):
     """Step-by-step log of the booking agent's actions for one booking."""
     __tablename__ = "agent_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False, index=True)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False)
 
     # e.g. "navigate", "fill_passenger", "select_seat", "payment", "confirm"
     step = Column(String(100), nullable=False)
@@ -104,14 +162,34 @@ class AgentLog(Base):
     # "success" | "in_progress" | "error"
     result = Column(String(20), nullable=False)
 
-    # Base64-encoded PNG screenshot at this step (only stored for errors + final confirm)
-    screenshot_b64 = Column(Text, nullable=True)
+    # Screenshot at this step (only stored for errors + final confirm) — see
+    # services/screenshot_store.py. s3:// URL when SCREENSHOT_BUCKET is set,
+    # otherwise zstd-compressed PNG bytes in screenshot_png.
+    screenshot_url = Column(String, nullable=True)
+    # Deferred: no reader of the step log needs the bytes, so loading a log
+    # list doesn't pull them
+    screenshot_png = deferred(Column(LargeBinary, nullable=True))
     error_message = Column(Text, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Part of the primary key: agent_logs is range-partitioned by month on
+    # created_at (migration 010), and the partition key must be in the PK
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False)
 
     booking = relationship("Booking", back_populates="agent_logs")
 
+    __table_args__ = (
+        # Serves Booking.agent_logs (filter by booking, ordered by created_at)
+        Index("ix_agent_logs_booking_id_created_at", "booking_id", "created_at"),
+        # Append-only table, so created_at correlates with physical order
+        Index(
+            "ix_agent_logs_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
 
 class TripAlert(Base):
     """Schedule change or price-drop alert for a confirmed trip."""
@@ -129,3 +207,17 @@ class TripAlert(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     trip = relationship("Trip", back_populates="alerts")
+
+
+class BrowserSession(Base):
+    """Saved browser storage state (cookies + localStorage) per user and booking site."""
+    __tablename__ = "browser_sessions"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    site = Column(String(255), primary_key=True)   # e.g. "www.united.com"
+
+    # Fernet-encrypted JSON from BrowserContext.storage_state(); it can hold
+    # loyalty-program login cookies, so it's never stored in the clear
+    storage_state_enc = Column(LargeBinary, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
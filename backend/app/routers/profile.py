@@ -1,21 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from app.database import get_db
 from app.models import User
 from app.auth import require_internal_key, get_current_user_email
-from app.encryption import encrypt, decrypt
+from app.encryption import encrypt_batch
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
+# Only the columns ProfileOut needs — the Fernet ciphertexts are never fetched
+# on reads. Built once so every request hits the compiled-statement cache.
+_PROFILE_BY_EMAIL = select(
+    User.first_name,
+    User.last_name,
+    User.date_of_birth,
+    User.phone,
+    User.passport_last4,
+    User.tsa_last4,
+    User.seat_preference,
+    User.meal_preference,
+    User.loyalty_numbers,
+).where(User.email == bindparam("email"))
+
+
+# Request/response models are immutable value objects; unknown keys are dropped
+_MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore")
+
 
 class LoyaltyProgram(BaseModel):
+    model_config = _MODEL_CONFIG
+
     program: str
     number: str
 
 
 class ProfileIn(BaseModel):
+    model_config = _MODEL_CONFIG
+
     # Personal info — needed by the booking agent to fill passenger forms
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -30,6 +54,8 @@ class ProfileIn(BaseModel):
 
 
 class ProfileOut(BaseModel):
+    model_config = _MODEL_CONFIG
+
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     date_of_birth: Optional[str] = None
@@ -41,91 +67,105 @@ class ProfileOut(BaseModel):
     loyalty_numbers: Optional[list[LoyaltyProgram]] = None
 
 
-def _mask(value: str | None) -> str | None:
-    """Return only the last 4 chars, rest replaced with bullets."""
-    if not value:
-        return None
-    if len(value) <= 4:
-        return "••••"
-    return "••••" + value[-4:]
+def _last4(value: str) -> str:
+    """Last 4 chars to store for masking; values of 4 or fewer are fully hidden."""
+    return value[-4:] if len(value) > 4 else ""
 
 
-@router.get("", response_model=ProfileOut)
-def get_profile(
-    email: str = Depends(get_current_user_email),
-    _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
-):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+def _mask(last4: str | None) -> str | None:
+    """Return bullets followed by the stored last 4 chars."""
+    if last4 is None:
+        return None
+    return "••••" + last4
 
-    decrypted_passport = decrypt(user.passport_number_enc)
-    decrypted_tsa = decrypt(user.tsa_known_traveler_enc)
 
-    return ProfileOut(
+def _user_to_profile_out(user) -> ProfileOut:
+    """
+    Build the response from a User (or a Row with the same column names).
+    Values come straight from our own DB, so model_construct skips validation.
+    """
+    return ProfileOut.model_construct(
         first_name=user.first_name,
         last_name=user.last_name,
         date_of_birth=user.date_of_birth,
         phone=user.phone,
-        passport_number=_mask(decrypted_passport),
-        tsa_known_traveler=_mask(decrypted_tsa),
+        passport_number=_mask(user.passport_last4),
+        tsa_known_traveler=_mask(user.tsa_last4),
         seat_preference=user.seat_preference,
         meal_preference=user.meal_preference,
-        loyalty_numbers=[LoyaltyProgram(**lp) for lp in (user.loyalty_numbers or [])],
+        loyalty_numbers=[LoyaltyProgram.model_construct(**lp) for lp in (user.loyalty_numbers or ())],
     )
 
 
+@router.get("", response_model=ProfileOut)
+async def get_profile(
+    email: str = Depends(get_current_user_email),
+    _key: str = Depends(require_internal_key),
+    db: AsyncSession = Depends(get_db),
+):
+    user = (await db.execute(_PROFILE_BY_EMAIL, {"email": email})).one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    return _user_to_profile_out(user)
+
+
 @router.post("", response_model=ProfileOut, status_code=status.HTTP_200_OK)
-def upsert_profile(
+async def upsert_profile(
     data: ProfileIn,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == email).first()
-
-    if not user:
-        user = User(email=email)
-        db.add(user)
+    # Only columns for submitted fields go into the upsert, so omitted
+    # fields keep their stored values on conflict
+    payload: dict = {}
 
     # Personal info
     if data.first_name is not None:
-        user.first_name = data.first_name
+        payload["first_name"] = data.first_name
     if data.last_name is not None:
-        user.last_name = data.last_name
+        payload["last_name"] = data.last_name
     if data.date_of_birth is not None:
-        user.date_of_birth = data.date_of_birth
+        payload["date_of_birth"] = data.date_of_birth
     if data.phone is not None:
-        user.phone = data.phone
+        payload["phone"] = data.phone
 
     # Only overwrite encrypted fields if new values were submitted
-    if data.passport_number:
-        user.passport_number_enc = encrypt(data.passport_number)
-    if data.tsa_known_traveler:
-        user.tsa_known_traveler_enc = encrypt(data.tsa_known_traveler)
+    sensitive = [
+        (enc_field, last4_field, value)
+        for enc_field, last4_field, value in (
+            ("passport_number_enc", "passport_last4", data.passport_number),
+            ("tsa_known_traveler_enc", "tsa_last4", data.tsa_known_traveler),
+        )
+        if value
+    ]
+    if sensitive:
+        tokens = encrypt_batch([value for _, _, value in sensitive])
+        for (enc_field, last4_field, value), token in zip(sensitive, tokens):
+            payload[enc_field] = token
+            payload[last4_field] = _last4(value)
 
     if data.seat_preference is not None:
-        user.seat_preference = data.seat_preference
+        payload["seat_preference"] = data.seat_preference
     if data.meal_preference is not None:
-        user.meal_preference = data.meal_preference
+        payload["meal_preference"] = data.meal_preference
     if data.loyalty_numbers is not None:
-        user.loyalty_numbers = [lp.model_dump() for lp in data.loyalty_numbers]
-
-    db.commit()
-    db.refresh(user)
-
-    decrypted_passport = decrypt(user.passport_number_enc)
-    decrypted_tsa = decrypt(user.tsa_known_traveler_enc)
-
-    return ProfileOut(
-        first_name=user.first_name,
-        last_name=user.last_name,
-        date_of_birth=user.date_of_birth,
-        phone=user.phone,
-        passport_number=_mask(decrypted_passport),
-        tsa_known_traveler=_mask(decrypted_tsa),
-        seat_preference=user.seat_preference,
-        meal_preference=user.meal_preference,
-        loyalty_numbers=[LoyaltyProgram(**lp) for lp in (user.loyalty_numbers or [])],
+        payload["loyalty_numbers"] = [lp.model_dump() for lp in data.loyalty_numbers]
+
+    # One round-trip: INSERT ... ON CONFLICT (email) DO UPDATE ... RETURNING users.*
+    stmt = (
+        pg_insert(User)
+        .values(email=email, **payload)
+        .on_conflict_do_update(
+            index_elements=[User.email],
+            set_={**payload, "updated_at": func.now()},
+        )
+        .returning(User)
     )
+    user = (
+        await db.execute(stmt, execution_options={"populate_existing": True})
+    ).scalar_one()
+    await db.commit()
+
+    return _user_to_profile_out(user)
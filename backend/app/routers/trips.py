@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Literal, Optional
+from datetime import datetime
+from uuid import UUID
 
 from app.database import get_db
-from app.models import User, Trip, Booking, AgentLog, TripAlert
-from app.auth import require_internal_key, get_current_user_email
-from app.services.trip_parser import parse_trip_request
-from app.services.amadeus import search_flights, search_hotels, search_activities
+from app.models import User, Trip, Booking, TripAlert
+from app.auth import require_internal_key, get_current_user, get_current_user_email
 from app.services.confirmation import build_confirmation
-from app.services.itinerary import build_itinerary_options
 
 router = APIRouter(prefix="/trips", tags=["trips"])
 
@@ -22,32 +23,52 @@ class TripRequestIn(BaseModel):
     raw_request: str
 
 
+# The *Out models validate straight from ORM objects (from_attributes), so
+# routes return rows as-is and Pydantic's core does the field conversion —
+# UUIDs and datetimes serialize to strings on the way out.
+_ORM_CONFIG = ConfigDict(from_attributes=True)
+
+
 class TripOut(BaseModel):
-    id: str
+    model_config = _ORM_CONFIG
+
+    id: UUID
     status: str
     raw_request: str
     parsed_spec: Optional[dict] = None
     itinerary_options: Optional[list] = None
     approved_itinerary: Optional[dict] = None
-    created_at: str
+    created_at: datetime
 
 
 class AgentLogOut(BaseModel):
+    model_config = _ORM_CONFIG
+
     step: str
     action: str
     result: str
     error_message: Optional[str] = None
-    created_at: str
+    created_at: datetime
 
 
 class BookingOut(BaseModel):
-    id: str
+    model_config = _ORM_CONFIG
+
+    id: UUID
     type: str
     status: str
     confirmation_number: Optional[str] = None
     details: Optional[dict] = None
-    logs: list[AgentLogOut] = []
-    created_at: str
+    # Read from Booking.agent_logs, still serialized as "logs"
+    logs: list[AgentLogOut] = Field(default=[], validation_alias="agent_logs")
+    created_at: datetime
+
+
+class BookIn(BaseModel):
+    # "batch" runs the agent's Claude calls through the Message Batches API:
+    # half the cost, but each step can take up to 24h. For bookings scheduled
+    # ahead of time, not ones a user is waiting on.
+    priority: Literal["interactive", "batch"] = "interactive"
 
 
 class BookOut(BaseModel):
@@ -57,12 +78,14 @@ class BookOut(BaseModel):
 
 
 class AlertOut(BaseModel):
-    id: str
+    model_config = _ORM_CONFIG
+
+    id: UUID
     alert_type: str
     message: str
     details: Optional[dict] = None
     is_read: bool
-    created_at: str
+    created_at: datetime
 
 
 class ModifyIn(BaseModel):
@@ -73,175 +96,83 @@ class ModifyIn(BaseModel):
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _trip_to_out(trip: Trip) -> TripOut:
-    return TripOut(
-        id=str(trip.id),
-        status=trip.status,
-        raw_request=trip.raw_request,
-        parsed_spec=trip.parsed_spec,
-        itinerary_options=trip.itinerary_options,
-        approved_itinerary=trip.approved_itinerary,
-        created_at=trip.created_at.isoformat(),
-    )
-
-
-def _log_to_out(log: AgentLog) -> AgentLogOut:
-    return AgentLogOut(
-        step=log.step,
-        action=log.action,
-        result=log.result,
-        error_message=log.error_message,
-        created_at=log.created_at.isoformat(),
-    )
-
-
-def _booking_to_out(booking: Booking) -> BookingOut:
-    return BookingOut(
-        id=str(booking.id),
-        type=booking.type,
-        status=booking.status,
-        confirmation_number=booking.confirmation_number,
-        details=booking.details,
-        logs=[_log_to_out(l) for l in (booking.agent_logs or [])],
-        created_at=booking.created_at.isoformat(),
-    )
+async def _get_owned_trip(db: AsyncSession, trip_id: str, email: str, with_user: bool = False) -> Trip:
+    """
+    Load a trip owned by `email` in a single JOIN query, or raise 404.
+    with_user=True also populates trip.user from the same row.
+    """
+    query = select(Trip).join(Trip.user).where(Trip.id == trip_id, User.email == email)
+    if with_user:
+        query = query.options(contains_eager(Trip.user))
+    trip = (await db.execute(query)).scalar_one_or_none()
+    if not trip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+    return trip
 
 
 # ---------------------------------------------------------------------------
 # Trip CRUD
 # ---------------------------------------------------------------------------
 
-@router.post("", response_model=TripOut, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=TripOut, status_code=status.HTTP_202_ACCEPTED)
 async def create_trip(
     data: TripRequestIn,
     email: str = Depends(get_current_user_email),
+    # The only route that needs the User row itself (it creates one if
+    # missing); /{trip_id} routes check ownership via _get_owned_trip's JOIN
+    user: Optional[User] = Depends(get_current_user),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Parse a plain-English trip request, search for flights + hotels, and return
-    2-3 itinerary options.
+    Accept a plain-English trip request and return 202 immediately with the
+    trip in "parsing" status. Parsing, flight + hotel search and building the
+    2-3 itinerary options run in the search_trip_options Celery task.
+
+    The frontend polls GET /trips/{id} for the options.
     """
-    user = db.query(User).filter(User.email == email).first()
+    from app.tasks.trip_tasks import search_trip_options
+
     if not user:
         user = User(email=email)
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
 
     trip = Trip(user_id=user.id, raw_request=data.raw_request, status="parsing")
     db.add(trip)
-    db.commit()
-    db.refresh(trip)
-
-    try:
-        parsed_spec = await parse_trip_request(data.raw_request)
-        trip.parsed_spec = parsed_spec
-        trip.status = "searching"
-        db.commit()
-
-        origin = parsed_spec.get("origin")
-        destination = parsed_spec.get("destination")
-        depart_date = parsed_spec.get("depart_date")
-        return_date = parsed_spec.get("return_date")
-        num_travelers = parsed_spec.get("num_travelers", 1) or 1
-        cabin_class = parsed_spec.get("cabin_class", "ECONOMY") or "ECONOMY"
-        budget_total = parsed_spec.get("budget_total")
-
-        flight_offers: list = []
-        hotel_offers: list = []
-        activity_offers: list = []
-
-        if origin and destination and depart_date:
-            try:
-                flight_offers = await search_flights(
-                    origin=origin,
-                    destination=destination,
-                    depart_date=depart_date,
-                    return_date=return_date,
-                    adults=num_travelers,
-                    travel_class=cabin_class,
-                )
-            except Exception as exc:
-                print(f"[trips] flight search error: {exc}")
-
-        if destination and depart_date and return_date:
-            try:
-                hotel_offers = await search_hotels(
-                    city_code=destination,
-                    check_in=depart_date,
-                    check_out=return_date,
-                    adults=num_travelers,
-                )
-            except Exception as exc:
-                print(f"[trips] hotel search error: {exc}")
-
-        if destination and depart_date:
-            try:
-                activity_offers = await search_activities(
-                    city_code=destination,
-                    start_date=depart_date,
-                    end_date=return_date or depart_date,
-                    adults=num_travelers,
-                )
-            except Exception as exc:
-                print(f"[trips] activity search error: {exc}")
-
-        options = build_itinerary_options(
-            flight_offers=flight_offers,
-            hotel_offers=hotel_offers,
-            budget_total=float(budget_total) if budget_total else None,
-            activity_offers=activity_offers,
-        )
-
-        trip.itinerary_options = options
-        trip.status = "options_ready" if options else "search_failed"
-        db.commit()
-        db.refresh(trip)
+    await db.commit()
 
-    except Exception as exc:
-        trip.status = "failed"
-        db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Trip processing failed: {exc}",
-        )
+    # Enqueue the Celery task — runs asynchronously
+    search_trip_options.delay(str(trip.id))
 
-    return _trip_to_out(trip)
+    return trip
 
 
 @router.get("", response_model=list[TripOut])
-def list_trips(
+async def list_trips(
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        return []
-    trips = (
-        db.query(Trip)
-        .filter(Trip.user_id == user.id)
+    # No user row yet simply means no trips — the JOIN returns nothing
+    trips = await db.scalars(
+        select(Trip)
+        .join(Trip.user)
+        .where(User.email == email)
         .order_by(Trip.created_at.desc())
-        .all()
     )
-    return [_trip_to_out(t) for t in trips]
+    return trips.all()
 
 
 @router.get("/{trip_id}", response_model=TripOut)
-def get_trip(
+async def get_trip(
     trip_id: str,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    return _trip_to_out(trip)
+    trip = await _get_owned_trip(db, trip_id, email)
+    return trip
 
 
 # ---------------------------------------------------------------------------
@@ -253,37 +184,49 @@ class ApproveIn(BaseModel):
 
 
 @router.post("/{trip_id}/approve", response_model=TripOut)
-def approve_trip(
+async def approve_trip(
     trip_id: str,
     data: ApproveIn,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
+    # Validate against the narrow columns only — itinerary_options stays in the DB
+    row = (await db.execute(
+        select(Trip.status, Trip.options_count)
+        .join(Trip.user)
+        .where(Trip.id == trip_id, User.email == email)
+    )).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    if trip.status != "options_ready":
+    if row.status != "options_ready":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Trip is not in options_ready state (current: {trip.status})",
+            detail=f"Trip is not in options_ready state (current: {row.status})",
         )
 
-    options = trip.itinerary_options or []
-    if data.option_index >= len(options):
+    count = row.options_count or 0
+    if not 0 <= data.option_index < count:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid option_index {data.option_index} (only {len(options)} options available)",
+            detail=f"Invalid option_index {data.option_index} (only {count} options available)",
         )
 
-    trip.approved_itinerary = options[data.option_index]
-    trip.status = "approved"
-    db.commit()
-    db.refresh(trip)
-    return _trip_to_out(trip)
+    # Copy the chosen option server-side (itinerary_options -> idx); the status
+    # guard makes a concurrent approve of the same trip a no-op
+    trip = (await db.execute(
+        update(Trip)
+        .where(Trip.id == trip_id, Trip.status == "options_ready")
+        .values(approved_itinerary=Trip.itinerary_options[data.option_index], status="approved")
+        .returning(Trip)
+    )).scalar_one_or_none()
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Trip is not in options_ready state",
+        )
+    await db.commit()
+    return trip
 
 
 # ---------------------------------------------------------------------------
@@ -291,11 +234,12 @@ def approve_trip(
 # ---------------------------------------------------------------------------
 
 @router.post("/{trip_id}/book", response_model=BookOut, status_code=status.HTTP_202_ACCEPTED)
-def book_trip(
+async def book_trip(
     trip_id: str,
+    data: Optional[BookIn] = None,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Start async booking for an approved trip. Creates Booking records, enqueues
@@ -305,13 +249,8 @@ def book_trip(
     """
     from app.tasks.booking_tasks import execute_trip_bookings
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+    trip = await _get_owned_trip(db, trip_id, email, with_user=True)
+    user = trip.user
 
     if trip.status != "approved":
         raise HTTPException(
@@ -328,43 +267,30 @@ def book_trip(
 
     approved = trip.approved_itinerary or {}
 
-    # Create one Booking record per component (flight + hotel)
+    # One Booking record per component (flight, hotel, each activity). IDs are
+    # generated client-side, so add_all + commit sends one batched INSERT with
+    # no RETURNING round trip per row.
+    priority = data.priority if data else "interactive"
     created_bookings = []
-
     if approved.get("flight"):
-        flight_booking = Booking(
-            trip_id=trip.id,
-            type="flight",
-            status="pending",
-            details={"flight": approved["flight"]},
+        created_bookings.append(
+            Booking(trip_id=trip.id, type="flight", status="pending", priority=priority,
+                    details={"flight": approved["flight"]})
         )
-        db.add(flight_booking)
-        created_bookings.append(flight_booking)
-
     if approved.get("hotel"):
-        hotel_booking = Booking(
-            trip_id=trip.id,
-            type="hotel",
-            status="pending",
-            details={"hotel": approved["hotel"]},
-        )
-        db.add(hotel_booking)
-        created_bookings.append(hotel_booking)
-
-    for activity in approved.get("activities", []):
-        activity_booking = Booking(
-            trip_id=trip.id,
-            type="activity",
-            status="pending",
-            details={"activity": activity},
+        created_bookings.append(
+            Booking(trip_id=trip.id, type="hotel", status="pending", priority=priority,
+                    details={"hotel": approved["hotel"]})
         )
-        db.add(activity_booking)
-        created_bookings.append(activity_booking)
+    created_bookings.extend(
+        Booking(trip_id=trip.id, type="activity", status="pending", priority=priority,
+                details={"activity": activity})
+        for activity in approved.get("activities", [])
+    )
+    db.add_all(created_bookings)
 
     trip.status = "booking"
-    db.commit()
-    for b in created_bookings:
-        db.refresh(b)
+    await db.commit()
 
     # Enqueue the Celery task — runs asynchronously
     execute_trip_bookings.delay(str(trip.id))
@@ -381,22 +307,24 @@ def book_trip(
 # ---------------------------------------------------------------------------
 
 @router.get("/{trip_id}/bookings", response_model=list[BookingOut])
-def list_bookings(
+async def list_bookings(
     trip_id: str,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Return all bookings for a trip, each with their agent log entries."""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-
-    bookings = db.query(Booking).filter(Booking.trip_id == trip_id).all()
-    return [_booking_to_out(b) for b in bookings]
+    await _get_owned_trip(db, trip_id, email)
+
+    # All logs in one IN (...) query, already ordered per the relationship's
+    # order_by; bookings listed in creation order
+    bookings = await db.scalars(
+        select(Booking)
+        .options(selectinload(Booking.agent_logs))
+        .where(Booking.trip_id == trip_id)
+        .order_by(Booking.created_at)
+    )
+    return bookings.all()
 
 
 # ---------------------------------------------------------------------------
@@ -404,29 +332,24 @@ def list_bookings(
 # ---------------------------------------------------------------------------
 
 @router.get("/{trip_id}/confirmation")
-def get_confirmation(
+async def get_confirmation(
     trip_id: str,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Return a structured confirmation dict for a confirmed trip.
     Includes PNR, hotel check-in/out, and activity names.
     """
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+    trip = await _get_owned_trip(db, trip_id, email)
     if trip.status != "confirmed":
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Trip is not confirmed yet (current status: {trip.status})",
         )
 
-    bookings = db.query(Booking).filter(Booking.trip_id == trip_id).all()
+    bookings = (await db.scalars(select(Booking).where(Booking.trip_id == trip_id))).all()
     return build_confirmation(trip, bookings)
 
 
@@ -435,59 +358,40 @@ def get_confirmation(
 # ---------------------------------------------------------------------------
 
 @router.get("/{trip_id}/alerts", response_model=list[AlertOut])
-def list_alerts(
+async def list_alerts(
     trip_id: str,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Return all monitoring alerts for a confirmed trip, newest first."""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+    await _get_owned_trip(db, trip_id, email)
 
-    alerts = (
-        db.query(TripAlert)
-        .filter(TripAlert.trip_id == trip_id)
+    alerts = await db.scalars(
+        select(TripAlert)
+        .where(TripAlert.trip_id == trip_id)
         .order_by(TripAlert.created_at.desc())
-        .all()
     )
-    return [
-        AlertOut(
-            id=str(a.id),
-            alert_type=a.alert_type,
-            message=a.message,
-            details=a.details,
-            is_read=a.is_read,
-            created_at=a.created_at.isoformat(),
-        )
-        for a in alerts
-    ]
+    return alerts.all()
 
 
 @router.post("/{trip_id}/alerts/{alert_id}/read", status_code=status.HTTP_204_NO_CONTENT)
-def mark_alert_read(
+async def mark_alert_read(
     trip_id: str,
     alert_id: str,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Mark a single alert as read."""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    alert = db.query(TripAlert).filter(TripAlert.id == alert_id, TripAlert.trip_id == trip_id).first()
+    await _get_owned_trip(db, trip_id, email)
+    alert = (await db.execute(
+        select(TripAlert).where(TripAlert.id == alert_id, TripAlert.trip_id == trip_id)
+    )).scalar_one_or_none()
     if not alert:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
     alert.is_read = True
-    db.commit()
+    await db.commit()
 
 
 # ---------------------------------------------------------------------------
@@ -500,7 +404,7 @@ async def modify_trip(
     data: ModifyIn,
     email: str = Depends(get_current_user_email),
     _key: str = Depends(require_internal_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Apply a natural-language modification to a confirmed trip.
@@ -512,18 +416,13 @@ async def modify_trip(
     """
     from app.services.modification import apply_modification
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == user.id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+    trip = await _get_owned_trip(db, trip_id, email)
     if trip.status not in ("confirmed", "booking_failed"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Modifications are only allowed on confirmed trips (current status: {trip.status})",
         )
 
-    bookings = db.query(Booking).filter(Booking.trip_id == trip_id).all()
+    bookings = (await db.scalars(select(Booking).where(Booking.trip_id == trip_id))).all()
     result = await apply_modification(trip, bookings, data.request, db)
     return result
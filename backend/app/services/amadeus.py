@@ -5,31 +5,93 @@ When AMADEUS_CLIENT_ID is not set, all search functions return realistic mock
 data so developers can work on the full UI flow without needing API credentials.
 """
 
+import asyncio
 import time
 from typing import Optional
 
 import httpx
+import orjson
 
 from app.config import settings
+from app.services import cache
 
 _AMADEUS_HOSTS = {
     "test": "https://test.api.amadeus.com",
     "production": "https://api.amadeus.com",
 }
 
+# Response cache TTLs (seconds). Fares move fast; a city's hotel list barely moves.
+_FLIGHTS_TTL = 180
+_HOTELS_BY_CITY_TTL = 86400
+_HOTEL_OFFERS_TTL = 300
+# Hotel IDs per hotel-offers request; chunks are fetched concurrently
+_HOTEL_OFFERS_CHUNK = 5
+
 _token: Optional[str] = None
+# time.monotonic() deadline, so wall-clock jumps can't extend or cut short a token
 _token_expires_at: float = 0.0
+# Serializes token refresh so concurrent searches don't all POST /oauth2/token
+# at once. Like the client, recreated per event loop.
+_token_lock: Optional[asyncio.Lock] = None
+_token_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# One pooled client for every Amadeus call, so token, hotels-by-city and
+# hotel-offers requests reuse the same TCP/TLS (HTTP/2) connection instead of
+# handshaking per call. Bound to the event loop it was created on: Celery
+# tasks each run under their own asyncio.run(), so a new loop gets a new client.
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            base_url=_AMADEUS_HOSTS.get(settings.amadeus_env, _AMADEUS_HOSTS["test"]),
+            http2=True,
+            # Over HTTP/2 the concurrent hotel-offers chunks multiplex on one
+            # connection; if the server only speaks HTTP/1.1, every socket the
+            # gather() opens stays pooled for the next search instead of being
+            # closed past a smaller keepalive cap
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=50),
+            timeout=20,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client. Called on app shutdown and at the end of Celery tasks."""
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _get_token_lock() -> asyncio.Lock:
+    global _token_lock, _token_lock_loop
+    loop = asyncio.get_running_loop()
+    if _token_lock is None or _token_lock_loop is not loop:
+        _token_lock = asyncio.Lock()
+        _token_lock_loop = loop
+    return _token_lock
 
 
 async def _get_token() -> str:
     global _token, _token_expires_at
-    if _token and time.time() < _token_expires_at - 60:
+    if _token and time.monotonic() < _token_expires_at - 60:
         return _token
 
-    base = _AMADEUS_HOSTS.get(settings.amadeus_env, _AMADEUS_HOSTS["test"])
-    async with httpx.AsyncClient() as client:
+    async with _get_token_lock():
+        # Another coroutine may have refreshed while we waited for the lock
+        if _token and time.monotonic() < _token_expires_at - 60:
+            return _token
+
+        client = get_client()
         resp = await client.post(
-            f"{base}/v1/security/oauth2/token",
+            "/v1/security/oauth2/token",
             data={
                 "grant_type": "client_credentials",
                 "client_id": settings.amadeus_client_id,
@@ -41,16 +103,32 @@ async def _get_token() -> str:
         resp.raise_for_status()
         data = resp.json()
         _token = data["access_token"]
-        _token_expires_at = time.time() + data["expires_in"]
+        _token_expires_at = time.monotonic() + data["expires_in"]
         return _token
 
 
 # ---------------------------------------------------------------------------
 # Mock data — returned when AMADEUS_CLIENT_ID is not configured
+#
+# Each *_template() builder is called once at import with "${field}"
+# placeholders and serialized to JSON bytes. A mock call is then a few
+# bytes.replace() substitutions plus one orjson.loads instead of rebuilding the
+# nested literals in Python.
 # ---------------------------------------------------------------------------
 
-def _mock_flights(origin: str, destination: str, depart_date: str, return_date: Optional[str]) -> list[dict]:
-    """Return a set of mock Amadeus-shaped flight offer objects."""
+def _compile(offers: list[dict]) -> bytes:
+    return orjson.dumps(offers)
+
+
+def _fill(template: bytes, **values: str) -> list[dict]:
+    """Substitute each ${name} placeholder (JSON-escaped) and parse the result."""
+    for name, value in values.items():
+        template = template.replace(b"${%s}" % name.encode(), orjson.dumps(value)[1:-1])
+    return orjson.loads(template)
+
+
+def _flight_offers_template(origin: str, destination: str, depart_date: str, return_date: Optional[str]) -> list[dict]:
+    """Mock Amadeus-shaped flight offer objects (one-way when return_date is None)."""
     return [
         {
             "id": "1",
@@ -179,8 +257,28 @@ def _mock_flights(origin: str, destination: str, depart_date: str, return_date:
     ]
 
 
-def _mock_hotels(city_code: str, check_in: str, check_out: str) -> list[dict]:
-    """Return mock Amadeus-shaped hotel offer objects."""
+_FLIGHTS_ROUND_TRIP = _compile(
+    _flight_offers_template("${origin}", "${destination}", "${depart_date}", "${return_date}")
+)
+_FLIGHTS_ONE_WAY = _compile(
+    _flight_offers_template("${origin}", "${destination}", "${depart_date}", None)
+)
+
+
+def _mock_flights(origin: str, destination: str, depart_date: str, return_date: Optional[str]) -> list[dict]:
+    """Return a set of mock Amadeus-shaped flight offer objects."""
+    template = _FLIGHTS_ROUND_TRIP if return_date else _FLIGHTS_ONE_WAY
+    return _fill(
+        template,
+        origin=origin,
+        destination=destination,
+        depart_date=depart_date,
+        return_date=return_date or "",
+    )
+
+
+def _hotel_offers_template(city_code: str, check_in: str, check_out: str) -> list[dict]:
+    """Mock Amadeus-shaped hotel offer objects."""
     return [
         {
             "hotel": {
@@ -233,6 +331,14 @@ def _mock_hotels(city_code: str, check_in: str, check_out: str) -> list[dict]:
     ]
 
 
+_HOTELS = _compile(_hotel_offers_template("${city_code}", "${check_in}", "${check_out}"))
+
+
+def _mock_hotels(city_code: str, check_in: str, check_out: str) -> list[dict]:
+    """Return mock Amadeus-shaped hotel offer objects."""
+    return _fill(_HOTELS, city_code=city_code, check_in=check_in, check_out=check_out)
+
+
 # ---------------------------------------------------------------------------
 # Public search functions
 # ---------------------------------------------------------------------------
@@ -250,9 +356,6 @@ async def search_flights(
     if not settings.amadeus_client_id:
         return _mock_flights(origin, destination, depart_date, return_date)
 
-    token = await _get_token()
-    base = _AMADEUS_HOSTS.get(settings.amadeus_env, _AMADEUS_HOSTS["test"])
-
     params: dict = {
         "originLocationCode": origin,
         "destinationLocationCode": destination,
@@ -265,19 +368,27 @@ async def search_flights(
     if return_date:
         params["returnDate"] = return_date
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{base}/v2/shopping/flight-offers",
-            params=params,
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=20,
-        )
-        resp.raise_for_status()
-        return resp.json().get("data", [])
+    cache_key = cache.make_key("amadeus:flights", params)
+    cached = await cache.get_json(cache_key)
+    if cached is not None:
+        return cached
 
+    token = await _get_token()
+    client = get_client()
+    resp = await client.get(
+        "/v2/shopping/flight-offers",
+        params=params,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=20,
+    )
+    resp.raise_for_status()
+    data = orjson.loads(resp.content).get("data", [])
+    await cache.set_json(cache_key, data, _FLIGHTS_TTL)
+    return data
 
-def _mock_activities(city_code: str, start_date: str, end_date: str) -> list[dict]:
-    """Return mock Viator-style activity offers."""
+
+def _activity_offers_template(city_code: str, start_date: str) -> list[dict]:
+    """Mock Viator-style activity offers."""
     return [
         {
             "activity_id": f"ACT-{city_code}-001",
@@ -318,6 +429,14 @@ def _mock_activities(city_code: str, start_date: str, end_date: str) -> list[dic
     ]
 
 
+_ACTIVITIES = _compile(_activity_offers_template("${city_code}", "${start_date}"))
+
+
+def _mock_activities(city_code: str, start_date: str, end_date: str) -> list[dict]:
+    """Return mock Viator-style activity offers."""
+    return _fill(_ACTIVITIES, city_code=city_code, start_date=start_date)
+
+
 async def search_activities(
     city_code: str,
     start_date: str,
@@ -342,38 +461,69 @@ async def search_hotels(
     if not settings.amadeus_client_id:
         return _mock_hotels(city_code, check_in, check_out)
 
+    offers_params = {
+        "cityCode": city_code,
+        "checkInDate": check_in,
+        "checkOutDate": check_out,
+        "adults": adults,
+    }
+    offers_key = cache.make_key("amadeus:hotel-offers", offers_params)
+    cached = await cache.get_json(offers_key)
+    if cached is not None:
+        return cached[:max_results]
+
     token = await _get_token()
-    base = _AMADEUS_HOSTS.get(settings.amadeus_env, _AMADEUS_HOSTS["test"])
+    client = get_client()
 
-    async with httpx.AsyncClient() as client:
-        # Step 1: get hotel IDs for the city
+    # Step 1: get hotel IDs for the city (near-static, cached for a day)
+    city_key = cache.make_key("amadeus:hotels-by-city", {"cityCode": city_code})
+    hotel_ids = await cache.get_json(city_key)
+    if hotel_ids is None:
         hotels_resp = await client.get(
-            f"{base}/v1/reference-data/locations/hotels/by-city",
+            "/v1/reference-data/locations/hotels/by-city",
             params={"cityCode": city_code, "radius": 10, "radiusUnit": "KM", "hotelSource": "ALL"},
             headers={"Authorization": f"Bearer {token}"},
             timeout=20,
         )
         hotels_resp.raise_for_status()
-        hotels = hotels_resp.json().get("data", [])
-        if not hotels:
-            return []
-
+        hotels = orjson.loads(hotels_resp.content).get("data", [])
         hotel_ids = [h["hotelId"] for h in hotels[:20]]
+        await cache.set_json(city_key, hotel_ids, _HOTELS_BY_CITY_TTL)
+    if not hotel_ids:
+        return []
 
-        # Step 2: fetch availability + pricing
-        offers_resp = await client.get(
-            f"{base}/v3/shopping/hotel-offers",
-            params={
-                "hotelIds": ",".join(hotel_ids),
-                "checkInDate": check_in,
-                "checkOutDate": check_out,
-                "adults": adults,
-                "currency": "USD",
-                "bestRateOnly": "true",
-            },
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=25,
-        )
-        if offers_resp.status_code != 200:
-            return []
-        return offers_resp.json().get("data", [])[:max_results]
+    # Step 2: fetch availability + pricing — in concurrent chunks, so one slow
+    # hotel doesn't hold up the whole response and a failed chunk only drops
+    # its own hotels
+    chunks = [
+        hotel_ids[i:i + _HOTEL_OFFERS_CHUNK]
+        for i in range(0, len(hotel_ids), _HOTEL_OFFERS_CHUNK)
+    ]
+    responses = await asyncio.gather(
+        *(
+            client.get(
+                "/v3/shopping/hotel-offers",
+                params={
+                    "hotelIds": ",".join(chunk),
+                    "checkInDate": check_in,
+                    "checkOutDate": check_out,
+                    "adults": adults,
+                    "currency": "USD",
+                    "bestRateOnly": "true",
+                },
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=25,
+            )
+            for chunk in chunks
+        ),
+        return_exceptions=True,
+    )
+    ok = [
+        r for r in responses
+        if isinstance(r, httpx.Response) and r.status_code == 200
+    ]
+    offers = [offer for r in ok for offer in orjson.loads(r.content).get("data", [])]
+    # Only cache a complete answer; a partial one should be retried next time
+    if len(ok) == len(chunks):
+        await cache.set_json(offers_key, offers, _HOTEL_OFFERS_TTL)
+    return offers[:max_results]
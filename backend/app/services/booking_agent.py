@@ -14,8 +14,8 @@ Mock mode  (BOOKING_MOCK_MODE=true, default)
     pipeline — approve → book → polling → confirmation — works in mock mode.
 
 Live mode  (BOOKING_MOCK_MODE=false)
-    Launches a real headless Chromium browser (local Playwright or
-    Browserless.io) and drives it with the Claude vision agent loop.
+    Drives a real headless Chromium browser (local Playwright or
+    Browserless.io, shared via browser_pool) with the Claude vision agent loop.
 
 Supported sites (live mode)
 ---------------------------
@@ -26,21 +26,39 @@ Activities: Not supported in live mode (use mock mode)
 
 Any other carrier in live mode raises BookingNotSupported, which sets the
 booking status to "unsupported" rather than "failed".
+
+Priority (live mode)
+--------------------
+interactive (default)
+    Each agent step calls the Messages API and gets its action back in seconds.
+batch
+    Each step is submitted as a one-request Message Batch at half the token
+    price and polled until it ends. Anthropic's SLA for a batch is 24 hours
+    (most finish far sooner), so use this only for bookings scheduled ahead of
+    time — never for one a user is watching.
 """
 
 import asyncio
 import base64
 import contextlib
+import hashlib
 import json
-import random
+import logging
+import os
 import re
-import string
+from datetime import datetime, timezone
 from typing import Optional
 
+import orjson
 from anthropic import AsyncAnthropic
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.database import SessionLocal
+from app.models import AgentLog, Booking
+from app.services import browser_pool, browser_storage, screenshot_store
+
+logger = logging.getLogger(__name__)
 
 
 class BookingNotSupported(Exception):
@@ -58,14 +76,59 @@ MARRIOTT_BRANDS = {
     "marriott", "westin", "sheraton", "w hotel", "st. regis",
     "ritz-carlton", "courtyard", "residence inn",
 }
+# One C-level scan for any brand; sorted so the pattern is stable across runs
+_MARRIOTT_RE = re.compile("|".join(re.escape(b) for b in sorted(MARRIOTT_BRANDS)))
+
+# Markdown code fences Claude sometimes wraps its JSON action in
+_FENCE_OPEN = re.compile(r"^```(?:json)?\s*")
+_FENCE_CLOSE = re.compile(r"\s*```$")
+
+
+def _parse_action(raw: str) -> dict:
+    """Parse Claude's JSON action reply, tolerating a markdown code fence."""
+    raw = _FENCE_OPEN.sub("", raw.strip())
+    raw = _FENCE_CLOSE.sub("", raw)
+    return orjson.loads(raw)
+
+
+def _write_logs(logs: list[AgentLog]) -> None:
+    """Insert a batch of AgentLog rows in one transaction. Runs in a worker thread."""
+    with SessionLocal() as db:
+        db.add_all(logs)
+        db.commit()
+
+
+# raw_decode() parses the first JSON value and reports where it ended, ignoring
+# whatever follows (a closing fence, or tokens not yet streamed)
+_DECODER = json.JSONDecoder()
 
 
 class BookingAgent:
     MAX_AGENT_STEPS = 30
-
-    def __init__(self, booking_id: str, db: Session):
+    # A "wait" answer is replayed for an unchanged screenshot at most this many
+    # times in a row before Claude is asked again
+    MAX_WAIT_REUSES = 3
+    # Poll interval for batch-priority steps: 1s, doubling up to 30s
+    BATCH_POLL_INITIAL_S = 1.0
+    BATCH_POLL_MAX_S = 30.0
+    # AgentLog rows are written in batches of up to LOG_BATCH_SIZE, or whatever
+    # has queued LOG_FLUSH_INTERVAL_S after the first row, whichever comes first
+    LOG_BATCH_SIZE = 20
+    LOG_FLUSH_INTERVAL_S = 0.5
+
+    def __init__(
+        self,
+        booking_id: str,
+        db: Session,
+        priority: str = "interactive",
+        user_id: Optional[str] = None,
+    ):
         self.booking_id = booking_id
         self.db = db
+        self.priority = priority
+        # Owner of the booking; keys the saved browser sessions (none if unset)
+        self.user_id = user_id
+        self._log_queue: asyncio.Queue = asyncio.Queue()
 
     # ------------------------------------------------------------------
     # Public entry point
@@ -81,21 +144,27 @@ class BookingAgent:
         """
         Execute the booking. Returns a confirmation number string.
         Raises BookingNotSupported or RuntimeError on failure.
+        Every logged step is committed before this returns or raises.
         """
-        if settings.booking_mock_mode:
-            return await self._mock_booking(booking_type, itinerary, traveler)
-
-        if booking_type == "flight":
-            return await self._book_flight(itinerary["flight"], traveler, virtual_card)
-        elif booking_type == "hotel":
-            return await self._book_hotel(itinerary["hotel"], traveler, virtual_card)
-        elif booking_type == "activity":
-            raise BookingNotSupported(
-                "Activity booking via Viator is not yet supported in live mode. "
-                "Set BOOKING_MOCK_MODE=true to simulate activity bookings."
-            )
-        else:
-            raise ValueError(f"Unknown booking type: {booking_type}")
+        log_writer = asyncio.create_task(self._drain_logs())
+        try:
+            if settings.booking_mock_mode:
+                return await self._mock_booking(booking_type, itinerary, traveler)
+
+            if booking_type == "flight":
+                return await self._book_flight(itinerary["flight"], traveler, virtual_card)
+            elif booking_type == "hotel":
+                return await self._book_hotel(itinerary["hotel"], traveler, virtual_card)
+            elif booking_type == "activity":
+                raise BookingNotSupported(
+                    "Activity booking via Viator is not yet supported in live mode. "
+                    "Set BOOKING_MOCK_MODE=true to simulate activity bookings."
+                )
+            else:
+                raise ValueError(f"Unknown booking type: {booking_type}")
+        finally:
+            await self._log_queue.join()
+            log_writer.cancel()
 
     # ------------------------------------------------------------------
     # Mock mode
@@ -122,7 +191,7 @@ class BookingAgent:
         else:
             hotel = itinerary.get("hotel", {})
             hotel_name = hotel.get("name", "").lower()
-            is_marriott = any(brand in hotel_name for brand in MARRIOTT_BRANDS)
+            is_marriott = bool(_MARRIOTT_RE.search(hotel_name))
             site = "marriott.com" if is_marriott else "expedia.com"
             target = hotel.get("name", "hotel")
 
@@ -138,11 +207,15 @@ class BookingAgent:
             ("confirm",        "Submitting booking"),
         ]
 
+        # With no delay, every step lands in the log writer's first batch: one
+        # INSERT + commit per mock booking
         for step_name, step_desc in steps:
-            await asyncio.sleep(1.2)
+            if settings.mock_step_delay_s:
+                await asyncio.sleep(settings.mock_step_delay_s)
             self._log_step(step_name, step_desc, "success")
 
-        confirmation = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        # 6 chars of A-Z/2-7 from the OS CSPRNG — reads like a real record locator
+        confirmation = base64.b32encode(os.urandom(4))[:6].decode()
         self._log_step("done", f"Booking confirmed — confirmation number: {confirmation}", "success")
         return confirmation
 
@@ -197,9 +270,9 @@ class BookingAgent:
             },
         }
 
-        async with self._browser_page() as page:
+        async with self._browser_page(site) as page:
             self._log_step("navigate", f"Navigating to {site}", "in_progress")
-            await page.goto(carrier_url, timeout=30_000)
+            await page.goto(carrier_url)
             return await self._agent_loop(page, context)
 
     # ------------------------------------------------------------------
@@ -208,7 +281,7 @@ class BookingAgent:
 
     async def _book_hotel(self, hotel: dict, traveler: dict, virtual_card: dict) -> str:
         hotel_name = hotel.get("name", "").lower()
-        is_marriott_brand = any(brand in hotel_name for brand in MARRIOTT_BRANDS)
+        is_marriott_brand = bool(_MARRIOTT_RE.search(hotel_name))
         has_marriott_loyalty = any(
             ln.get("program", "").lower() in ("marriott bonvoy", "marriott")
             for ln in traveler.get("loyalty_numbers", [])
@@ -243,9 +316,9 @@ class BookingAgent:
             },
         }
 
-        async with self._browser_page() as page:
+        async with self._browser_page(site) as page:
             self._log_step("navigate", f"Navigating to {site}", "in_progress")
-            await page.goto(booking_url, timeout=30_000)
+            await page.goto(booking_url)
             return await self._agent_loop(page, context)
 
     # ------------------------------------------------------------------
@@ -258,14 +331,50 @@ class BookingAgent:
         Returns a confirmation number when Claude signals "done".
         """
         client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        # Task + rules are fixed for the whole booking: built once, sent as a
+        # cache_control system block so repeat steps can hit Anthropic's prompt
+        # cache (it only engages once the block reaches the model's minimum
+        # cacheable length; below that the marker is ignored)
+        system = [{
+            "type": "text",
+            "text": self._build_static_prompt(context),
+            "cache_control": {"type": "ephemeral"},
+        }]
+        wait_reuses = 0
+        # Digest of the previous step's screenshot and the action taken on it
+        prev_digest, prev_action = b"", {}
+        # (digest, base64) of the last screenshot sent — an unchanged page
+        # isn't re-encoded
+        last_encoded: tuple[bytes, str] = (b"", "")
 
         for step_num in range(self.MAX_AGENT_STEPS):
             screenshot_bytes = await page.screenshot(type="png")
-            screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
 
-            response = await client.messages.create(
+            # If the page hasn't changed since the last step and Claude said to
+            # wait on it (spinner, interstitial), wait again without another
+            # model call. Only the previous step counts: an earlier screenshot
+            # that matches again means the page went back, which needs a fresh look.
+            digest = hashlib.sha256(screenshot_bytes).digest()
+            if (
+                digest == prev_digest
+                and prev_action.get("action") == "wait"
+                and wait_reuses < self.MAX_WAIT_REUSES
+            ):
+                wait_reuses += 1
+                self._log_step(f"step_{step_num}", f"[wait] {prev_action.get('thought', '')} (page unchanged)", "in_progress")
+                await self._execute_action(page, prev_action)
+                continue
+            wait_reuses = 0
+
+            if last_encoded[0] != digest:
+                # ~0.3 MB of base64 per step; encode off the event loop
+                encoded = await asyncio.to_thread(base64.b64encode, screenshot_bytes)
+                last_encoded = (digest, encoded.decode())
+            screenshot_b64 = last_encoded[1]
+            params = dict(
                 model="claude-sonnet-4-6",
                 max_tokens=1024,
+                system=system,
                 messages=[
                     {
                         "role": "user",
@@ -280,17 +389,18 @@ class BookingAgent:
                             },
                             {
                                 "type": "text",
-                                "text": self._build_prompt(context, step_num),
+                                "text": f"Step {step_num + 1} of max {self.MAX_AGENT_STEPS}.",
                             },
                         ],
                     }
                 ],
             )
-
-            raw = response.content[0].text.strip()
-            raw = re.sub(r"^```(?:json)?\s*", "", raw)
-            raw = re.sub(r"\s*```$", "", raw)
-            action = json.loads(raw)
+            if self.priority == "batch":
+                response = await self._create_batched(client, params, step_num)
+                action = _parse_action(response.content[0].text)
+            else:
+                action = await self._stream_action(client, params)
+            prev_digest, prev_action = digest, action
 
             action_type = action.get("action", "wait")
             thought = action.get("thought", "")
@@ -301,7 +411,7 @@ class BookingAgent:
                 f"step_{step_num}",
                 f"[{action_type}] {thought}",
                 "in_progress" if action_type not in ("done", "error") else action_type,
-                screenshot_b64=screenshot_b64 if save_screenshot else None,
+                screenshot_png=screenshot_bytes if save_screenshot else None,
             )
 
             if action_type == "done":
@@ -311,14 +421,62 @@ class BookingAgent:
 
             if action_type == "error":
                 msg = action.get("error_message", "Agent reported an error")
-                self._log_step("error", msg, "error", screenshot_b64=screenshot_b64)
+                self._log_step("error", msg, "error", screenshot_png=screenshot_bytes)
                 raise RuntimeError(msg)
 
             await self._execute_action(page, action)
 
         raise RuntimeError(f"Agent reached {self.MAX_AGENT_STEPS} steps without completing the booking")
 
-    def _build_prompt(self, context: dict, step_num: int) -> str:
+    async def _stream_action(self, client: AsyncAnthropic, params: dict) -> dict:
+        """
+        Stream one agent step and return its action as soon as a complete JSON
+        object has arrived — no waiting for the model to finish the turn.
+        Leaving the stream context closes the response early.
+        """
+        parts: list[str] = []
+        async with client.messages.stream(**params) as stream:
+            async for text in stream.text_stream:
+                parts.append(text)
+                # The object can only have closed on a chunk carrying a "}"
+                if "}" not in text:
+                    continue
+                raw = "".join(parts)
+                start = raw.find("{")
+                if start < 0:
+                    continue
+                try:
+                    action, _ = _DECODER.raw_decode(raw, start)
+                except ValueError:
+                    continue
+                if isinstance(action, dict):
+                    return action
+        return _parse_action("".join(parts))
+
+    async def _create_batched(self, client: AsyncAnthropic, params: dict, step_num: int):
+        """
+        Run one agent step through the Message Batches API and return its Message.
+        The batch ID is saved on the booking before polling starts.
+        """
+        batch = await client.messages.batches.create(
+            requests=[{"custom_id": f"{self.booking_id}-{step_num}", "params": params}]
+        )
+        self._save_batch_id(batch.id)
+
+        delay = self.BATCH_POLL_INITIAL_S
+        while batch.processing_status != "ended":
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.BATCH_POLL_MAX_S)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        async for entry in await client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                return entry.result.message
+            raise RuntimeError(f"Batch step {entry.custom_id} {entry.result.type}")
+        raise RuntimeError(f"Batch {batch.id} ended without a result")
+
+    def _build_static_prompt(self, context: dict) -> str:
+        """Everything in the agent prompt that doesn't change between steps."""
         goal = context.get("goal", "")
 
         if goal == "book_flight":
@@ -328,7 +486,7 @@ class BookingAgent:
                 f"  Flight: {context.get('flight_number')} departing {context.get('depart_date')}\n"
                 f"  Route: {context.get('origin')} → {context.get('destination')}\n"
                 f"  Cabin: {context.get('cabin')}\n"
-                f"  Passenger: {json.dumps(context['passenger'])}\n"
+                f"  Passenger: {orjson.dumps(context['passenger']).decode()}\n"
                 f"  Payment: Visa virtual card ending "
                 f"{context['virtual_card']['number'][-4:]} "
                 f"exp {context['virtual_card']['exp_month']}/{context['virtual_card']['exp_year']}"
@@ -338,13 +496,13 @@ class BookingAgent:
                 f"Book a hotel room at {context.get('hotel_name')} on {context.get('site')}:\n"
                 f"  Check-in: {context.get('check_in')}   Check-out: {context.get('check_out')}\n"
                 f"  Room type: {context.get('room_type')}\n"
-                f"  Guest: {json.dumps(context['passenger'])}\n"
+                f"  Guest: {orjson.dumps(context['passenger']).decode()}\n"
                 f"  Payment: Visa virtual card ending "
                 f"{context['virtual_card']['number'][-4:]} "
                 f"exp {context['virtual_card']['exp_month']}/{context['virtual_card']['exp_year']}"
             )
 
-        return f"""You are controlling a web browser to complete a booking. Step {step_num + 1} of max {self.MAX_AGENT_STEPS}.
+        return f"""You are controlling a web browser to complete a booking. Each message gives the current step number and a screenshot.
 
 Task:
 {task}
@@ -394,7 +552,19 @@ Rules:
             await page.wait_for_timeout(400)
 
         elif action_type == "wait":
-            await page.wait_for_timeout(2_000)
+            # Resume once the page settles instead of a flat 2s. The floor
+            # matters: wait_for_load_state returns at once if the page is
+            # already network-idle, so a JS-only spinner would get no time at
+            # all and each replayed wait would burn a step in milliseconds.
+            # Everything is bounded, so a page that never idles costs at most 3.75s
+            from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+            await page.wait_for_timeout(750)
+            try:
+                await page.wait_for_load_state("networkidle", timeout=2_000)
+                await page.wait_for_function("document.readyState === 'complete'", timeout=1_000)
+            except PlaywrightTimeoutError:
+                pass
 
         # "select" — Claude should click the dropdown then click the option value;
         # fallback: treat like click at coordinates
@@ -408,53 +578,90 @@ Rules:
     # ------------------------------------------------------------------
 
     @contextlib.asynccontextmanager
-    async def _browser_page(self):
-        from playwright.async_api import async_playwright
-
-        async with async_playwright() as p:
-            if settings.browserless_url:
-                browser = await p.chromium.connect(settings.browserless_url)
-            else:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=["--no-sandbox", "--disable-setuid-sandbox"],
-                )
-
-            ctx = await browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                user_agent=(
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                ),
-            )
+    async def _browser_page(self, site: str):
+        # Fresh context on the shared browser — no per-booking browser launch —
+        # seeded with this user's saved session for the site, if any
+        state = browser_storage.load(self.db, self.user_id, site) if self.user_id else None
+        ctx = await browser_pool.acquire(storage_state=state)
+        try:
             page = await ctx.new_page()
+            page.set_default_navigation_timeout(30_000)
             try:
                 yield page
-            finally:
-                await browser.close()
+            except Exception:
+                if self.user_id and state is not None:
+                    browser_storage.invalidate(self.db, self.user_id, site)
+                raise
+            # Booking went through — keep the session for the next one on this
+            # site. By now the booking is confirmed and paid for, so a failure
+            # here is logged and must never surface as a failed booking.
+            if self.user_id:
+                try:
+                    browser_storage.save(self.db, self.user_id, site, await ctx.storage_state())
+                except Exception as exc:
+                    logger.warning("[booking_agent] failed to save %s session: %s", site, exc)
+        finally:
+            await browser_pool.release(ctx)
 
     # ------------------------------------------------------------------
     # Logging
     # ------------------------------------------------------------------
 
+    def _save_batch_id(self, batch_id: str) -> None:
+        self.db.query(Booking).filter(Booking.id == self.booking_id).update({"batch_id": batch_id})
+        self.db.commit()
+
     def _log_step(
         self,
         step: str,
         action: str,
         result: str,
-        screenshot_b64: Optional[str] = None,
+        screenshot_png: Optional[bytes] = None,
         error_message: Optional[str] = None,
     ) -> None:
-        from app.models import AgentLog
-
+        """
+        Queue an AgentLog row; _drain_logs() stores its screenshot and writes it
+        in the next batch.
+        """
         log = AgentLog(
             booking_id=self.booking_id,
             step=step,
             action=action,
             result=result,
-            screenshot_b64=screenshot_b64,
             error_message=error_message,
+            # Stamped here: a batch shares one transaction, and the server
+            # default now() would give all of its rows the same created_at
+            created_at=datetime.now(timezone.utc),
         )
-        self.db.add(log)
-        self.db.commit()
+        self._log_queue.put_nowait((log, screenshot_png))
+
+    async def _drain_logs(self) -> None:
+        """
+        Write queued AgentLog rows with one INSERT + commit per batch, uploading
+        any screenshots first. Runs for the life of run(). The write itself
+        runs in a worker thread on its own session, so a flush never blocks
+        the agent loop or the other bookings sharing this event loop.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._log_queue.get()]
+            deadline = loop.time() + self.LOG_FLUSH_INTERVAL_S
+            while len(batch) < self.LOG_BATCH_SIZE:
+                try:
+                    batch.append(await asyncio.wait_for(self._log_queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                for log, png in batch:
+                    if png is None:
+                        continue
+                    log.screenshot_url = await screenshot_store.put(png)
+                    if log.screenshot_url is None:
+                        log.screenshot_png = screenshot_store.compress(png)
+                await asyncio.to_thread(_write_logs, [log for log, _ in batch])
+            except Exception as exc:
+                # Losing progress logs must never fail the booking itself
+                logger.warning("[booking_agent] failed to write %d log rows: %s", len(batch), exc)
+            finally:
+                for _ in batch:
+                    self._log_queue.task_done()
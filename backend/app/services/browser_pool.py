@@ -0,0 +1,127 @@
+"""
+Shared Playwright browser for the live-mode booking agent.
+
+One Playwright driver and one Chromium (local launch, or a single CDP
+connection to Browserless) serve every booking in the process. Each booking
+gets its own BrowserContext — separate cookies, storage and pages — so
+bookings stay isolated without paying browser start-up per booking.
+
+Usage:
+    ctx = await browser_pool.acquire()
+    try:
+        page = await ctx.new_page()
+        ...
+    finally:
+        await browser_pool.release(ctx)
+
+Playwright objects belong to the event loop that created them. Celery tasks
+each run under their own asyncio.run(), so the pool is rebuilt when the loop
+changes and close() is called at the end of each task.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+_CONTEXT_ARGS = {
+    # 1072px wide keeps each agent screenshot inside Claude Vision's 1072x1072
+    # tile with no server-side downscale, and click coordinates stay 1:1
+    "viewport": {"width": 1072, "height": 800},
+    "user_agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+}
+
+_playwright: Optional["Playwright"] = None
+_browser: Optional["Browser"] = None
+_lock: Optional[asyncio.Lock] = None
+# Caps open contexts, so N concurrent bookings share one browser over at most
+# max_concurrent_bookings contexts
+_semaphore: Optional[asyncio.Semaphore] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _bind_loop() -> None:
+    """(Re)create the loop-bound primitives when called from a new event loop."""
+    global _playwright, _browser, _lock, _semaphore, _loop
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        # Anything left from a previous loop can't be awaited from this one
+        _playwright = None
+        _browser = None
+        _lock = asyncio.Lock()
+        _semaphore = asyncio.Semaphore(settings.max_concurrent_bookings)
+        _loop = loop
+
+
+async def _get_browser() -> "Browser":
+    global _playwright, _browser
+    async with _lock:
+        if _browser is not None and _browser.is_connected():
+            return _browser
+
+        from playwright.async_api import async_playwright
+
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        if settings.browserless_url:
+            _browser = await _playwright.chromium.connect(settings.browserless_url)
+        else:
+            _browser = await _playwright.chromium.launch(
+                headless=True,
+                args=["--no-sandbox", "--disable-setuid-sandbox"],
+            )
+        logger.info("[browser_pool] browser started (%s)", "browserless" if settings.browserless_url else "local")
+        return _browser
+
+
+async def acquire(storage_state: Optional[dict] = None) -> "BrowserContext":
+    """
+    Open a fresh BrowserContext on the shared browser, waiting for a free slot.
+    storage_state (cookies + localStorage from a previous context) seeds it.
+    """
+    _bind_loop()
+    await _semaphore.acquire()
+    try:
+        browser = await _get_browser()
+        return await browser.new_context(**_CONTEXT_ARGS, storage_state=storage_state)
+    except BaseException:
+        _semaphore.release()
+        raise
+
+
+async def release(ctx: "BrowserContext") -> None:
+    """Close a context from acquire(). The browser itself stays up."""
+    try:
+        await ctx.close()
+    except Exception as exc:
+        logger.warning("[browser_pool] context close failed: %s", exc)
+    finally:
+        _semaphore.release()
+
+
+async def close() -> None:
+    """Shut down the browser and Playwright driver. Called at the end of Celery tasks."""
+    global _playwright, _browser, _lock, _semaphore, _loop
+    if _loop is asyncio.get_running_loop():
+        if _browser is not None:
+            try:
+                await _browser.close()
+            except Exception as exc:
+                logger.warning("[browser_pool] browser close failed: %s", exc)
+        if _playwright is not None:
+            await _playwright.stop()
+    _playwright = None
+    _browser = None
+    _lock = None
+    _semaphore = None
+    _loop = None
@@ -0,0 +1,79 @@
+"""
+Saved browser sessions for the live booking agent.
+
+After a successful booking the agent saves its BrowserContext.storage_state()
+(cookies + localStorage) for that user and site; the next booking on the same
+site starts from it, so consent banners are already dismissed and loyalty
+logins are still in place. Sessions older than SESSION_TTL are ignored, and a
+session is dropped when a booking that started from it fails, in case stale
+cookies were the cause.
+
+Best-effort by design: any error here is logged and the agent simply starts
+from a blank context.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import orjson
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.encryption import decrypt_bytes, encrypt_bytes
+from app.models import BrowserSession
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL = timedelta(days=30)
+
+
+def load(db: Session, user_id: str, site: str) -> Optional[dict]:
+    """Return the saved storage state for (user, site), or None if absent or expired."""
+    try:
+        row = (
+            db.query(BrowserSession.storage_state_enc)
+            .filter(
+                BrowserSession.user_id == user_id,
+                BrowserSession.site == site,
+                BrowserSession.updated_at > datetime.now(timezone.utc) - SESSION_TTL,
+            )
+            .first()
+        )
+        return orjson.loads(decrypt_bytes(row.storage_state_enc)) if row else None
+    except Exception as exc:
+        db.rollback()
+        logger.warning("[browser_storage] load %s failed: %s", site, exc)
+        return None
+
+
+def save(db: Session, user_id: str, site: str, state: dict) -> None:
+    """Insert or replace the storage state for (user, site)."""
+    enc = encrypt_bytes(orjson.dumps(state))
+    try:
+        db.execute(
+            pg_insert(BrowserSession)
+            .values(user_id=user_id, site=site, storage_state_enc=enc)
+            .on_conflict_do_update(
+                index_elements=[BrowserSession.user_id, BrowserSession.site],
+                set_={"storage_state_enc": enc, "updated_at": func.now()},
+            )
+        )
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.warning("[browser_storage] save %s failed: %s", site, exc)
+
+
+def invalidate(db: Session, user_id: str, site: str) -> None:
+    """Forget the storage state for (user, site)."""
+    try:
+        db.query(BrowserSession).filter(
+            BrowserSession.user_id == user_id,
+            BrowserSession.site == site,
+        ).delete()
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.warning("[browser_storage] invalidate %s failed: %s", site, exc)
@@ -0,0 +1,80 @@
+"""
+Redis-backed response cache for third-party search APIs.
+
+Best-effort by design: when CACHE_REDIS_URL is empty or Redis is unreachable,
+get_json() returns None and set_json() does nothing, so callers always fall
+through to the live API. A cache outage never fails a request.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+
+import orjson
+import redis.asyncio as redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bound to the event loop it was created on (Celery tasks each run their own
+# asyncio.run()), same as the shared Amadeus client.
+_redis: Optional[redis.Redis] = None
+_redis_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_redis() -> Optional[redis.Redis]:
+    global _redis, _redis_loop
+    if not settings.cache_redis_url:
+        return None
+    loop = asyncio.get_running_loop()
+    if _redis is None or _redis_loop is not loop:
+        # Short timeouts: a slow cache must not cost more than it saves
+        _redis = redis.from_url(
+            settings.cache_redis_url,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        _redis_loop = loop
+    return _redis
+
+
+def make_key(namespace: str, params: dict) -> str:
+    """Stable cache key for a set of query parameters."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+async def get_json(key: str) -> Optional[Any]:
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except Exception as exc:
+        logger.warning("[cache] get %s failed: %s", key, exc)
+        return None
+    # Cache hits carry whole Amadeus offer lists; orjson parses them several
+    # times faster than the stdlib, same as the live responses
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def set_json(key: str, value: Any, ttl: int) -> None:
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, orjson.dumps(value), ex=ttl)
+    except Exception as exc:
+        logger.warning("[cache] set %s failed: %s", key, exc)
+
+
+async def close() -> None:
+    """Close the connection pool. Called on app shutdown and at the end of Celery tasks."""
+    global _redis, _redis_loop
+    if _redis is not None and _redis_loop is asyncio.get_running_loop():
+        await _redis.aclose()
+    _redis = None
+    _redis_loop = None
@@ -13,6 +13,55 @@ if TYPE_CHECKING:
     from app.models import Booking, Trip
 
 
+def _flight_item(booking: "Booking", details: dict) -> tuple[dict, float]:
+    flight = details.get("flight", {})
+    segments = flight.get("segments")
+    first_seg = segments[0] if segments else {}
+    return {
+        "type": "flight",
+        "confirmation_number": booking.confirmation_number,
+        "carrier": flight.get("carrier", ""),
+        "flight_number": first_seg.get("flight", ""),
+        "origin": first_seg.get("from", ""),
+        "destination": first_seg.get("to", ""),
+        "depart_datetime": first_seg.get("departs", ""),
+        "cabin": flight.get("cabin", ""),
+    }, flight.get("price_usd", 0.0)
+
+
+def _hotel_item(booking: "Booking", details: dict) -> tuple[dict, float]:
+    hotel = details.get("hotel", {})
+    return {
+        "type": "hotel",
+        "confirmation_number": booking.confirmation_number,
+        "hotel_name": hotel.get("name", ""),
+        "check_in": hotel.get("check_in", ""),
+        "check_out": hotel.get("check_out", ""),
+        "room_type": hotel.get("room_type", ""),
+    }, hotel.get("price_total_usd", 0.0)
+
+
+def _activity_item(booking: "Booking", details: dict) -> tuple[dict, float]:
+    activity = details.get("activity", {})
+    return {
+        "type": "activity",
+        "confirmation_number": booking.confirmation_number,
+        "activity_name": activity.get("name", ""),
+        "date": activity.get("date", ""),
+        "category": activity.get("category", ""),
+        "duration_hours": activity.get("duration_hours"),
+    }, activity.get("price_usd", 0.0)
+
+
+# booking.type -> handler returning (confirmation item, price charged if confirmed).
+# Bookings of any other type are left out of the confirmation.
+_HANDLERS = {
+    "flight": _flight_item,
+    "hotel": _hotel_item,
+    "activity": _activity_item,
+}
+
+
 def build_confirmation(trip: "Trip", bookings: list["Booking"]) -> dict:
     """
     Build a structured confirmation dict from a confirmed trip and its bookings.
@@ -27,56 +76,18 @@ def build_confirmation(trip: "Trip", bookings: list["Booking"]) -> dict:
         }
     """
     parsed = trip.parsed_spec or {}
-    approved = trip.approved_itinerary or {}
 
     booking_items = []
     total_charged = 0.0
 
     for booking in bookings:
-        details = booking.details or {}
-
-        if booking.type == "flight":
-            flight = details.get("flight", {})
-            segments = flight.get("segments", [])
-            first_seg = segments[0] if segments else {}
-            booking_items.append({
-                "type": "flight",
-                "confirmation_number": booking.confirmation_number,
-                "carrier": flight.get("carrier", ""),
-                "flight_number": first_seg.get("flight", ""),
-                "origin": first_seg.get("from", ""),
-                "destination": first_seg.get("to", ""),
-                "depart_datetime": first_seg.get("departs", ""),
-                "cabin": flight.get("cabin", ""),
-            })
-            if booking.status == "confirmed":
-                total_charged += flight.get("price_usd", 0.0)
-
-        elif booking.type == "hotel":
-            hotel = details.get("hotel", {})
-            booking_items.append({
-                "type": "hotel",
-                "confirmation_number": booking.confirmation_number,
-                "hotel_name": hotel.get("name", ""),
-                "check_in": hotel.get("check_in", ""),
-                "check_out": hotel.get("check_out", ""),
-                "room_type": hotel.get("room_type", ""),
-            })
-            if booking.status == "confirmed":
-                total_charged += hotel.get("price_total_usd", 0.0)
-
-        elif booking.type == "activity":
-            activity = details.get("activity", {})
-            booking_items.append({
-                "type": "activity",
-                "confirmation_number": booking.confirmation_number,
-                "activity_name": activity.get("name", ""),
-                "date": activity.get("date", ""),
-                "category": activity.get("category", ""),
-                "duration_hours": activity.get("duration_hours"),
-            })
-            if booking.status == "confirmed":
-                total_charged += activity.get("price_usd", 0.0)
+        handler = _HANDLERS.get(booking.type)
+        if handler is None:
+            continue
+        item, price = handler(booking, booking.details or {})
+        booking_items.append(item)
+        if booking.status == "confirmed":
+            total_charged += price
 
     return {
         "trip_id": str(trip.id),
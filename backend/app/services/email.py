@@ -5,12 +5,29 @@ If SENDGRID_API_KEY is empty, the function logs a warning and returns without
 raising — email is best-effort and should not block the booking pipeline.
 """
 
+import asyncio
 import logging
+from typing import TYPE_CHECKING, Optional
 
 from app.config import settings
 
+if TYPE_CHECKING:
+    from sendgrid import SendGridAPIClient  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# One client per process; its send() is blocking, so calls go through to_thread
+_sg_client: Optional["SendGridAPIClient"] = None
+
+
+def _get_client() -> "SendGridAPIClient":
+    global _sg_client
+    if _sg_client is None:
+        import sendgrid  # type: ignore
+
+        _sg_client = sendgrid.SendGridAPIClient(api_key=settings.sendgrid_api_key)
+    return _sg_client
+
 
 async def send_booking_confirmation(
     user_email: str,
@@ -34,7 +51,6 @@ async def send_booking_confirmation(
         return
 
     try:
-        import sendgrid  # type: ignore
         from sendgrid.helpers.mail import Mail  # type: ignore
 
         html_body = _build_html(user_name, confirmation)
@@ -46,8 +62,7 @@ async def send_booking_confirmation(
             html_content=html_body,
         )
 
-        sg = sendgrid.SendGridAPIClient(api_key=settings.sendgrid_api_key)
-        response = sg.send(message)
+        response = await asyncio.to_thread(_get_client().send, message)
         logger.info(
             "[email] Confirmation sent to %s — status %s",
             user_email,
@@ -72,7 +87,6 @@ async def send_alert_email(
         return
 
     try:
-        import sendgrid  # type: ignore
         from sendgrid.helpers.mail import Mail  # type: ignore
 
         html_body = _build_alert_html(user_name, destination, alerts)
@@ -88,8 +102,7 @@ async def send_alert_email(
             html_content=html_body,
         )
 
-        sg = sendgrid.SendGridAPIClient(api_key=settings.sendgrid_api_key)
-        response = sg.send(message)
+        response = await asyncio.to_thread(_get_client().send, message)
         logger.info("[email] Alert sent to %s — status %s", user_email, response.status_code)
     except Exception as exc:
         logger.warning("[email] Failed to send alert email: %s", exc)
@@ -122,6 +135,39 @@ def _build_alert_html(user_name: str, destination: str, alerts: list[dict]) -> s
 </html>"""
 
 
+def _render_row(b: dict) -> str:
+    """One <tr> of the confirmation table for a booking summary from build_confirmation()."""
+    get = b.get
+    btype = get("type", "")
+
+    if btype == "flight":
+        detail = (
+            f"{get('carrier', '')} {get('flight_number', '')} &mdash; "
+            f"{get('origin', '')} &rarr; {get('destination', '')} "
+            f"departing {get('depart_datetime', '')[:16].replace('T', ' ')} "
+            f"({get('cabin', '')})"
+        )
+    elif btype == "hotel":
+        detail = (
+            f"{get('hotel_name', '')} &mdash; "
+            f"Check-in: {get('check_in', '')} &bull; Check-out: {get('check_out', '')} "
+            f"({get('room_type', '')})"
+        )
+    else:
+        detail = (
+            f"{get('activity_name', '')} &mdash; {get('date', '')} "
+            f"({get('duration_hours', '')}h, {get('category', '')})"
+        )
+
+    return (
+        f"<tr>"
+        f"<td style='padding:8px;text-transform:capitalize'>{btype}</td>"
+        f"<td style='padding:8px;font-family:monospace'>{get('confirmation_number') or '—'}</td>"
+        f"<td style='padding:8px'>{detail}</td>"
+        f"</tr>"
+    )
+
+
 def _build_html(user_name: str, confirmation: dict) -> str:
     destination = confirmation.get("destination", "your destination")
     dates = confirmation.get("travel_dates", {})
@@ -130,39 +176,7 @@ def _build_html(user_name: str, confirmation: dict) -> str:
     total = confirmation.get("total_charged_usd", 0.0)
     bookings = confirmation.get("bookings", [])
 
-    booking_rows = []
-    for b in bookings:
-        btype = b.get("type", "")
-        conf_num = b.get("confirmation_number") or "—"
-
-        if btype == "flight":
-            detail = (
-                f"{b.get('carrier', '')} {b.get('flight_number', '')} &mdash; "
-                f"{b.get('origin', '')} &rarr; {b.get('destination', '')} "
-                f"departing {b.get('depart_datetime', '')[:16].replace('T', ' ')} "
-                f"({b.get('cabin', '')})"
-            )
-        elif btype == "hotel":
-            detail = (
-                f"{b.get('hotel_name', '')} &mdash; "
-                f"Check-in: {b.get('check_in', '')} &bull; Check-out: {b.get('check_out', '')} "
-                f"({b.get('room_type', '')})"
-            )
-        else:
-            detail = (
-                f"{b.get('activity_name', '')} &mdash; {b.get('date', '')} "
-                f"({b.get('duration_hours', '')}h, {b.get('category', '')})"
-            )
-
-        booking_rows.append(
-            f"<tr>"
-            f"<td style='padding:8px;text-transform:capitalize'>{btype}</td>"
-            f"<td style='padding:8px;font-family:monospace'>{conf_num}</td>"
-            f"<td style='padding:8px'>{detail}</td>"
-            f"</tr>"
-        )
-
-    rows_html = "\n".join(booking_rows)
+    rows_html = "".join([_render_row(b) for b in bookings])
     date_range = f"{depart}" + (f" &ndash; {ret}" if ret else "")
 
     return f"""<!DOCTYPE html>
@@ -12,23 +12,22 @@ def _extract_flight(offer: dict) -> Optional[dict]:
         price = float(offer["price"]["grandTotal"])
         itineraries = offer["itineraries"]
 
-        segments: list[dict] = []
-        for itin in itineraries:
-            for seg in itin["segments"]:
-                segments.append(
-                    {
-                        "from": seg["departure"]["iataCode"],
-                        "departs": seg["departure"]["at"],
-                        "to": seg["arrival"]["iataCode"],
-                        "arrives": seg["arrival"]["at"],
-                        "flight": seg["carrierCode"] + seg["number"],
-                        "carrier": seg["carrierCode"],
-                        "duration": seg.get("duration", ""),
-                    }
-                )
-
-        outbound_segments = itineraries[0]["segments"] if itineraries else []
-        outbound_stops = len(outbound_segments) - 1
+        segments = [
+            {
+                "from": seg["departure"]["iataCode"],
+                "departs": seg["departure"]["at"],
+                "to": seg["arrival"]["iataCode"],
+                "arrives": seg["arrival"]["at"],
+                "flight": seg["carrierCode"] + seg["number"],
+                "carrier": seg["carrierCode"],
+                "duration": seg.get("duration", ""),
+            }
+            for itin in itineraries
+            for seg in itin["segments"]
+        ]
+
+        outbound = itineraries[0] if itineraries else {}
+        outbound_stops = len(outbound.get("segments", ())) - 1
 
         return {
             "id": offer.get("id", ""),
@@ -39,7 +38,7 @@ def _extract_flight(offer: dict) -> Optional[dict]:
                 else "ECONOMY"
             ),
             "outbound_stops": outbound_stops,
-            "outbound_duration": itineraries[0].get("duration", "") if itineraries else "",
+            "outbound_duration": outbound.get("duration", ""),
             "carrier": offer.get("validatingAirlineCodes", [""])[0],
             "segments": segments,
         }
@@ -95,12 +94,11 @@ def build_itinerary_options(
     flights.sort(key=lambda f: f["price_usd"])
     hotels.sort(key=lambda h: h["price_total_usd"])
 
-    activities = activity_offers or []
+    # Every option carries the same (up to 3) activities
+    selected_activities = (activity_offers or [])[:3]
+    activities_total = round(sum(a.get("price_usd", 0) for a in selected_activities), 2)
 
     def _make_option(label: str, description: str, flight: dict, hotel: dict) -> dict:
-        # Include up to 3 activities in each option
-        selected_activities = activities[:3]
-        activities_total = round(sum(a.get("price_usd", 0) for a in selected_activities), 2)
         total = round(flight["price_usd"] + hotel["price_total_usd"] + activities_total, 2)
         return {
             "label": label,
@@ -126,16 +124,17 @@ def build_itinerary_options(
             options.append(_make_option("Best Value", "Balanced price and quality", mid_f, mid_h))
 
     # Option 3 — Premium: direct/fastest flight + best hotel
-    direct = [f for f in flights if f["outbound_stops"] == 0]
-    best_flight = direct[0] if direct else flights[-1]
+    # flights is price-sorted, so the first direct one is the cheapest direct
+    best_flight = next((f for f in flights if f["outbound_stops"] == 0), flights[-1])
     best_hotel = hotels[-1]
-    premium_option = _make_option("Premium", "Best flight and hotel combination", best_flight, best_hotel)
     # Only add if it differs from options already present
     if not any(
-        o["flight"]["id"] == premium_option["flight"]["id"]
-        and o["hotel"]["hotel_id"] == premium_option["hotel"]["hotel_id"]
+        o["flight"]["id"] == best_flight["id"]
+        and o["hotel"]["hotel_id"] == best_hotel["hotel_id"]
         for o in options
     ):
-        options.append(premium_option)
+        options.append(
+            _make_option("Premium", "Best flight and hotel combination", best_flight, best_hotel)
+        )
 
     return options[:3]
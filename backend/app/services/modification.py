@@ -166,7 +166,7 @@ async def _modify_hotel_extend(trip, bookings, nights: int, db) -> dict:
             return _err("Live hotel modification failed. Please contact the hotel directly.")
 
     hotel_booking.details = {**details, "hotel": updated}
-    db.commit()
+    await db.commit()
 
     price_per_night = hotel.get("price_per_night_usd", 0)
     extra_cost = round(price_per_night * nights, 2)
@@ -215,7 +215,7 @@ async def _modify_hotel_shorten(trip, bookings, nights: int, db) -> dict:
             return _err("Live hotel modification failed. Please contact the hotel directly.")
 
     hotel_booking.details = {**details, "hotel": updated}
-    db.commit()
+    await db.commit()
 
     return {
         "success": True,
@@ -248,7 +248,7 @@ async def _modify_seat_upgrade(trip, bookings, cabin: str, db) -> dict:
         )
 
     flight_booking.details = {**details, "flight": updated_flight}
-    db.commit()
+    await db.commit()
 
     cabin_label = cabin.replace("_", " ").title()
     return {
@@ -290,7 +290,7 @@ async def _modify_room_upgrade(trip, bookings, room_type: str, db) -> dict:
         )
 
     hotel_booking.details = {**details, "hotel": updated_hotel}
-    db.commit()
+    await db.commit()
 
     return {
         "success": True,
@@ -12,6 +12,8 @@ import logging
 import random
 from datetime import datetime, timedelta
 
+import orjson
+
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -214,7 +216,7 @@ async def _live_flight_changes(booking: dict) -> list[dict]:
             if resp.status_code != 200:
                 return []
 
-            data = resp.json().get("data", [])
+            data = orjson.loads(resp.content).get("data", [])
             if not data:
                 return []
 
@@ -286,7 +288,7 @@ async def _live_price_drop(booking: dict, original_price_usd: float) -> list[dic
             if resp.status_code != 200:
                 return []
 
-            offers = resp.json().get("data", [])
+            offers = orjson.loads(resp.content).get("data", [])
             if not offers:
                 return []
 
@@ -234,3 +234,15 @@ async def parse_trip_request(raw_request: str) -> dict:
     if settings.anthropic_api_key:
         return await _parse_with_claude(raw_request)
     return _parse_with_rules(raw_request)
+
+
+def parse_trip_request_fast(raw_request: str) -> Optional[dict]:
+    """
+    Instant rule-based first pass, for speculatively starting searches while
+    parse_trip_request() waits on Claude. Returns None when Claude isn't
+    configured — parse_trip_request() is then the same rule-based parse and
+    there is nothing to overlap.
+    """
+    if not settings.anthropic_api_key:
+        return None
+    return _parse_with_rules(raw_request)
@@ -2,10 +2,14 @@
 Stripe Issuing — creates a single-use virtual card for each booking.
 
 Design:
-  - One Stripe Cardholder per user (keyed by email), created lazily.
+  - One Stripe Cardholder per user (keyed by email), created lazily and saved
+    on users.stripe_cardholder_id so each user is looked up at most once.
   - One virtual card per booking, with a spending limit equal to the booking amount.
   - The card is cancelled if the booking fails, preventing any accidental charge.
 
+Calls go to Stripe's REST API over a shared async httpx client (the blocking
+stripe SDK is kept as a fallback behind STRIPE_USE_SDK).
+
 When STRIPE_SECRET_KEY is not set, all functions return realistic mock card data
 so the full booking pipeline can be tested without a Stripe account.
 
@@ -17,18 +21,133 @@ Production notes:
     compliance instead of retrieving raw card numbers server-side.
 """
 
-import random
-import string
+import asyncio
+import secrets
+from typing import Any, Optional
+from urllib.parse import urlencode
 
+import httpx
+import orjson
 import stripe
 
 from app.config import settings
 
+# Issuing calls go straight to Stripe's REST API on one pooled async client, so
+# the concurrent bookings of a trip don't serialize on the SDK's blocking I/O.
+# Bound to the event loop it was created on, like the shared Amadeus client.
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            base_url="https://api.stripe.com/v1",
+            auth=(settings.stripe_secret_key, ""),
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=50),
+            timeout=30,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client. Called at the end of Celery tasks."""
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _form(params: dict, prefix: str = "") -> list[tuple[str, str]]:
+    """Flatten params into Stripe's form encoding: a[b][0][c]=v, expand[]=x."""
+    pairs = []
+    for key, value in params.items():
+        name = f"{prefix}[{key}]" if prefix else key
+        if isinstance(value, dict):
+            pairs.extend(_form(value, name))
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, dict):
+                    pairs.extend(_form(item, f"{name}[{i}]"))
+                else:
+                    pairs.append((f"{name}[]", str(item)))
+        elif isinstance(value, bool):
+            pairs.append((name, "true" if value else "false"))
+        else:
+            pairs.append((name, str(value)))
+    return pairs
+
+
+async def _request(method: str, path: str, params: Optional[dict] = None) -> dict[str, Any]:
+    client = _get_client()
+    form = _form(params) if params else None
+    if method == "GET":
+        resp = await client.get(path, params=form)
+    else:
+        resp = await client.post(
+            path,
+            content=urlencode(form or []),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+    body = orjson.loads(resp.content)
+    if resp.is_error:
+        message = body.get("error", {}).get("message", resp.reason_phrase)
+        raise RuntimeError(f"Stripe {method} {path} failed ({resp.status_code}): {message}")
+    return body
+
+
+# SDK fallback: configured once here rather than on every call. Its requests
+# client keeps a keep-alive session per thread, so the to_thread calls below
+# reuse connections too.
+if settings.stripe_secret_key:
+    stripe.api_key = settings.stripe_secret_key
+    stripe.default_http_client = stripe.RequestsClient(timeout=30)
+
+
+# ---------------------------------------------------------------------------
+# Issuing API calls — REST by default, the stripe SDK with STRIPE_USE_SDK.
+# Both return dict-like objects (StripeObject subclasses dict).
+# ---------------------------------------------------------------------------
+
+async def _list_cardholders(**params) -> dict:
+    if settings.stripe_use_sdk:
+        return await asyncio.to_thread(stripe.issuing.Cardholder.list, **params)
+    return await _request("GET", "/issuing/cardholders", params)
+
+
+async def _create_cardholder(**params) -> dict:
+    if settings.stripe_use_sdk:
+        return await asyncio.to_thread(stripe.issuing.Cardholder.create, **params)
+    return await _request("POST", "/issuing/cardholders", params)
+
+
+async def _create_card(**params) -> dict:
+    if settings.stripe_use_sdk:
+        return await asyncio.to_thread(stripe.issuing.Card.create, **params)
+    return await _request("POST", "/issuing/cards", params)
+
+
+async def _retrieve_card(card_id: str, **params) -> dict:
+    if settings.stripe_use_sdk:
+        return await asyncio.to_thread(stripe.issuing.Card.retrieve, card_id, **params)
+    return await _request("GET", f"/issuing/cards/{card_id}", params)
+
+
+async def _modify_card(card_id: str, **params) -> dict:
+    if settings.stripe_use_sdk:
+        return await asyncio.to_thread(stripe.issuing.Card.modify, card_id, **params)
+    return await _request("POST", f"/issuing/cards/{card_id}", params)
+
 
 def _mock_card(amount_usd: float, description: str) -> dict:
     """Return a realistic fake card for development / mock mode."""
     return {
-        "card_id": "mock_card_" + "".join(random.choices(string.ascii_lowercase + string.digits, k=8)),
+        "card_id": "mock_card_" + secrets.token_hex(4),
         "number": "4111111111111111",  # Standard Visa test number
         "exp_month": "12",
         "exp_year": "2027",
@@ -40,42 +159,59 @@ def _mock_card(amount_usd: float, description: str) -> dict:
     }
 
 
-async def create_virtual_card(amount_usd: float, description: str, user_email: str) -> dict:
+async def get_cardholder_id(user_email: str) -> Optional[str]:
+    """
+    Find or create the Stripe Issuing cardholder for a user.
+    Returns None in mock mode (STRIPE_SECRET_KEY not configured).
+    """
+    if not settings.stripe_secret_key:
+        return None
+
+    existing = await _list_cardholders(email=user_email, limit=1)
+    if existing["data"]:
+        return existing["data"][0]["id"]
+
+    cardholder = await _create_cardholder(
+        name=user_email,
+        email=user_email,
+        type="individual",
+        billing={
+            "address": {
+                "line1": "123 Travel St",
+                "city": "San Francisco",
+                "state": "CA",
+                "postal_code": "94105",
+                "country": "US",
+            }
+        },
+    )
+    return cardholder["id"]
+
+
+async def create_virtual_card(
+    amount_usd: float,
+    description: str,
+    user_email: str,
+    cardholder_id: Optional[str] = None,
+) -> dict:
     """
     Create a single-use Stripe Issuing virtual card capped at `amount_usd`.
     Returns a dict with: card_id, number, exp_month, exp_year, cvc, amount_usd.
 
+    Pass cardholder_id when it's already known (see get_cardholder_id);
+    otherwise it is looked up by user_email.
+
     Falls back to mock data when STRIPE_SECRET_KEY is not configured.
     """
     if not settings.stripe_secret_key:
         return _mock_card(amount_usd, description)
 
-    stripe.api_key = settings.stripe_secret_key
-
-    # Find or create a cardholder for this user
-    existing = stripe.issuing.Cardholder.list(email=user_email, limit=1)
-    if existing.data:
-        cardholder_id = existing.data[0].id
-    else:
-        cardholder = stripe.issuing.Cardholder.create(
-            name=user_email,
-            email=user_email,
-            type="individual",
-            billing={
-                "address": {
-                    "line1": "123 Travel St",
-                    "city": "San Francisco",
-                    "state": "CA",
-                    "postal_code": "94105",
-                    "country": "US",
-                }
-            },
-        )
-        cardholder_id = cardholder.id
+    if not cardholder_id:
+        cardholder_id = await get_cardholder_id(user_email)
 
     # Create virtual card with a per-authorization spending limit
     amount_cents = int(amount_usd * 100)
-    card = stripe.issuing.Card.create(
+    card = await _create_card(
         cardholder=cardholder_id,
         currency="usd",
         type="virtual",
@@ -87,18 +223,20 @@ async def create_virtual_card(amount_usd: float, description: str, user_email: s
         metadata={"description": description},
     )
 
-    # Retrieve sensitive details (requires issuing_card_number:read permission)
-    sensitive = stripe.issuing.Card.retrieve(
-        card.id,
+    # Retrieve sensitive details (requires issuing_card_number:read permission).
+    # Stripe only returns number/cvc from the Retrieve endpoint — expanding them
+    # on Card.create is silently ignored — so this second call can't be folded in.
+    sensitive = await _retrieve_card(
+        card["id"],
         expand=["number", "cvc"],
     )
 
     return {
-        "card_id": card.id,
-        "number": sensitive.number,
-        "exp_month": str(card.exp_month).zfill(2),
-        "exp_year": str(card.exp_year),
-        "cvc": sensitive.cvc,
+        "card_id": card["id"],
+        "number": sensitive["number"],
+        "exp_month": str(card["exp_month"]).zfill(2),
+        "exp_year": str(card["exp_year"]),
+        "cvc": sensitive["cvc"],
         "amount_usd": amount_usd,
         "currency": "usd",
         "description": description,
@@ -111,5 +249,4 @@ async def void_virtual_card(card_id: str) -> None:
     if not settings.stripe_secret_key or card_id.startswith("mock_card_"):
         return  # Nothing to cancel in mock mode
 
-    stripe.api_key = settings.stripe_secret_key
-    stripe.issuing.Card.modify(card_id, status="canceled")
+    await _modify_card(card_id, status="canceled")
@@ -7,14 +7,27 @@ celery_app = Celery(
     "travel_planner",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=["app.tasks.booking_tasks", "app.tasks.monitor_tasks"],
+    include=[
+        "app.tasks.trip_tasks",
+        "app.tasks.booking_tasks",
+        "app.tasks.monitor_tasks",
+        "app.tasks.maintenance_tasks",
+    ],
 )
 
-celery_app.conf.task_serializer = "json"
-celery_app.conf.result_serializer = "json"
-celery_app.conf.accept_content = ["json"]
+# msgpack: smaller broker messages and faster (de)serialization than json. Task
+# args are plain strings, so nothing needs converting. Workers still accept json
+# so messages queued by producers on an older release drain during a rollout.
+celery_app.conf.task_serializer = "msgpack"
+celery_app.conf.result_serializer = "msgpack"
+celery_app.conf.accept_content = ["msgpack", "json"]
 celery_app.conf.task_track_started = True
-celery_app.conf.worker_prefetch_multiplier = 1  # one task at a time per worker
+# One task at a time per worker process. Each task runs its own asyncio.run(),
+# so a process can't overlap trips; a higher multiplier would only park more
+# long booking tasks behind the running one while other processes sit idle.
+# Scale trip throughput with --concurrency instead — each process holds up to
+# max_concurrent_bookings + 1 DB connections during execute_trip_bookings.
+celery_app.conf.worker_prefetch_multiplier = 1
 
 # Run trip monitoring once per hour, every day
 celery_app.conf.beat_schedule = {
@@ -22,4 +35,9 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.monitor_tasks.scan_confirmed_trips",
         "schedule": crontab(minute=0),  # top of every hour
     },
+    # Keep next month's agent_logs partition created ahead of inserts
+    "ensure-agent-log-partitions": {
+        "task": "app.tasks.maintenance_tasks.ensure_agent_log_partitions",
+        "schedule": crontab(minute=30, hour=0),  # daily at 00:30
+    },
 }
@@ -4,17 +4,23 @@ Celery tasks for async booking execution.
 The primary task is execute_trip_bookings(trip_id), which:
   1. Retrieves the approved itinerary and all pending bookings for the trip.
   2. Builds the traveler context from the user's profile.
-  3. For each booking, in sequence:
+  3. For each booking, concurrently (each in its own DB session):
        a. Creates a Stripe Issuing virtual card capped at the booking amount.
        b. Runs the BookingAgent (mock or Playwright + Claude vision).
-       c. Records confirmation_number on success, or marks the booking failed.
-  4. Sets the trip status to "confirmed" or "booking_failed" when finished.
+       c. Returns the booking's final state: confirmation_number on success,
+          or failed/unsupported with the error.
+  4. Voids the virtual cards of the bookings that failed, concurrently.
+  5. Writes every booking's final state and the trip status ("confirmed" or
+     "booking_failed") in a single transaction.
+     If anything fails after the bookings are claimed, the claimed rows are
+     marked failed so none is left in_progress.
 
 Start the worker alongside uvicorn:
     celery -A app.worker worker --loglevel=info
 """
 
 import asyncio
+from typing import Optional
 
 from app.tasks import celery_app
 
@@ -29,32 +35,36 @@ def execute_trip_bookings(self, trip_id: str) -> None:
 
 
 async def _async_execute_trip_bookings(trip_id: str) -> None:
+    import logging
+
+    from sqlalchemy import update
+    from sqlalchemy.orm import joinedload
+
     from app.database import SessionLocal
     from app.encryption import decrypt
-    from app.models import Booking, Trip, User
-    from app.services.booking_agent import BookingAgent, BookingNotSupported
-    from app.services.virtual_card import create_virtual_card, void_virtual_card
+    from app.models import Booking, Trip
+    from app.services import browser_pool, virtual_card
+
+    logger = logging.getLogger(__name__)
 
     db = SessionLocal()
     try:
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
+        # Trip and its owner in one round-trip
+        trip = (
+            db.query(Trip)
+            .options(joinedload(Trip.user))
+            .filter(Trip.id == trip_id)
+            .first()
+        )
         if not trip:
             return
 
-        user = db.query(User).filter(User.id == trip.user_id).first()
+        user = trip.user
         if not user:
             trip.status = "booking_failed"
             db.commit()
             return
 
-        bookings = (
-            db.query(Booking)
-            .filter(Booking.trip_id == trip_id, Booking.status == "pending")
-            .all()
-        )
-        if not bookings:
-            return
-
         # Build the traveler context once — used by every booking agent call
         loyalty_list = user.loyalty_numbers or []
         traveler = {
@@ -70,81 +80,121 @@ async def _async_execute_trip_bookings(trip_id: str) -> None:
             "tsa_number": decrypt(user.tsa_known_traveler_enc) if user.tsa_known_traveler_enc else "",
         }
 
-        approved = trip.approved_itinerary or {}
-        all_confirmed = True
+        # Resolve the Stripe cardholder once for the whole trip, before any
+        # booking is claimed: if Stripe is down the bookings stay pending and
+        # the retry picks them up. A newly found id is saved with the claim.
+        if not user.stripe_cardholder_id:
+            user.stripe_cardholder_id = await virtual_card.get_cardholder_id(user.email)
 
-        activity_bookings_count = sum(1 for b in bookings if b.type == "activity")
+        # Claim the pending bookings in one statement; dashboards see them go
+        # in_progress straight away, and a retried task won't pick them up twice
+        bookings = db.execute(
+            update(Booking)
+            .where(Booking.trip_id == trip_id, Booking.status == "pending")
+            .values(status="in_progress")
+            .returning(Booking.id, Booking.type, Booking.details, Booking.priority)
+        ).all()
+        db.commit()
+        if not bookings:
+            return
 
-        for booking in bookings:
-            booking.status = "in_progress"
-            db.commit()
+        # From here on every claimed booking must end in a final state — a
+        # retry won't see them again, since they are no longer pending
+        updates = None
+        try:
+            # Virtual card amount per booking type, worked out once for the trip;
+            # the activities total is split evenly across the activity bookings
+            approved = trip.approved_itinerary or {}
+            default_amount = approved.get("total_usd", 0)
+            activity_bookings_count = sum(1 for b in bookings if b.type == "activity")
+            amount_by_type = {
+                "flight": approved.get("flight", {}).get("price_usd", default_amount),
+                "hotel": approved.get("hotel", {}).get("price_total_usd", default_amount),
+                "activity": (
+                    approved.get("activities_total_usd", 0) / activity_bookings_count
+                    if activity_bookings_count > 0
+                    else 0
+                ),
+            }
 
-            virtual_card = None
-            try:
-                # Determine the amount for this booking's virtual card
-                if booking.type == "flight":
-                    amount = approved.get("flight", {}).get("price_usd", approved.get("total_usd", 0))
-                elif booking.type == "hotel":
-                    amount = approved.get("hotel", {}).get("price_total_usd", approved.get("total_usd", 0))
-                elif booking.type == "activity":
-                    activities_total = approved.get("activities_total_usd", 0)
-                    amount = (
-                        activities_total / activity_bookings_count
-                        if activity_bookings_count > 0
-                        else 0
+            # Bookings are independent, so run them side by side; browser_pool
+            # caps how many live browser contexts are open at once
+            results = await asyncio.gather(
+                *[
+                    _book_one(
+                        booking=b,
+                        trip_id=trip_id,
+                        amount=float(amount_by_type.get(b.type, default_amount)),
+                        # For activity bookings, inject the specific activity into
+                        # the itinerary so the agent knows which one to simulate.
+                        itinerary=(
+                            {**approved, "activity": (b.details or {}).get("activity", {})}
+                            if b.type == "activity"
+                            else approved
+                        ),
+                        traveler=traveler,
+                        user_id=str(user.id),
+                        user_email=user.email,
+                        cardholder_id=user.stripe_cardholder_id,
                     )
-                else:
-                    amount = approved.get("total_usd", 0)
-
-                virtual_card = await create_virtual_card(
-                    amount_usd=float(amount),
-                    description=f"Trip {trip_id} — {booking.type}",
-                    user_email=user.email,
-                )
-                booking.virtual_card_id = virtual_card["card_id"]
-                db.commit()
-
-                # For activity bookings, inject the specific activity into
-                # the itinerary so the agent knows which one to simulate.
-                if booking.type == "activity":
-                    itinerary_for_agent = {
-                        **approved,
-                        "activity": (booking.details or {}).get("activity", {}),
+                    for b in bookings
+                ],
+                return_exceptions=True,
+            )
+            updates = []
+            for b, result in zip(bookings, results):
+                if isinstance(result, BaseException):
+                    logger.error("[booking_tasks] booking %s worker crashed: %s", b.id, result)
+                    result = {
+                        "id": b.id,
+                        "status": "failed",
+                        "details": {**(b.details or {}), "error": str(result)},
                     }
-                else:
-                    itinerary_for_agent = approved
-
-                agent = BookingAgent(booking_id=str(booking.id), db=db)
-                confirmation = await agent.run(
-                    booking_type=booking.type,
-                    itinerary=itinerary_for_agent,
-                    traveler=traveler,
-                    virtual_card=virtual_card,
-                )
+                updates.append(result)
 
-                booking.status = "confirmed"
-                booking.confirmation_number = confirmation
-                db.commit()
+            # Cancel the cards of every booking that didn't go through, all at
+            # once; one failed void must not stop the others or the status write
+            to_void = [
+                u["virtual_card_id"]
+                for u in updates
+                if u["status"] != "confirmed" and u.get("virtual_card_id")
+            ]
+            voids = await asyncio.gather(
+                *[virtual_card.void_virtual_card(card_id) for card_id in to_void],
+                return_exceptions=True,
+            )
+            for card_id, void in zip(to_void, voids):
+                if isinstance(void, BaseException):
+                    logger.error("[booking_tasks] could not void card %s: %s", card_id, void)
 
-            except BookingNotSupported as exc:
-                booking.status = "unsupported"
-                booking.details = {**(booking.details or {}), "error": str(exc)}
-                db.commit()
-                all_confirmed = False
-                # Void the card if one was created
-                if virtual_card:
-                    await void_virtual_card(virtual_card["card_id"])
+            all_confirmed = _save_outcomes(db, trip, updates)
 
-            except Exception as exc:
-                booking.status = "failed"
-                booking.details = {**(booking.details or {}), "error": str(exc)}
-                db.commit()
-                all_confirmed = False
-                if virtual_card:
-                    await void_virtual_card(virtual_card["card_id"])
-
-        trip.status = "confirmed" if all_confirmed else "booking_failed"
-        db.commit()
+        except Exception as exc:
+            db.rollback()
+            if updates is None:
+                # Failed before any booking ran to completion (no card was
+                # created yet either) — fail the claimed rows rather than strand
+                # them in_progress
+                logger.exception("[booking_tasks] trip %s failed before booking", trip_id)
+                updates = [
+                    {
+                        "id": b.id,
+                        "status": "failed",
+                        "details": {**(b.details or {}), "error": f"Booking task failed: {exc}"},
+                    }
+                    for b in bookings
+                ]
+            else:
+                # The outcome write itself failed; try once more so confirmation
+                # numbers and card ids of completed bookings aren't dropped
+                logger.exception("[booking_tasks] trip %s outcome write failed, retrying", trip_id)
+            try:
+                all_confirmed = _save_outcomes(db, trip, updates)
+            except Exception:
+                db.rollback()
+                # Last resort: keep the outcomes in the log for manual recovery
+                logger.critical("[booking_tasks] trip %s outcomes not saved: %r", trip_id, updates)
+                raise
 
         if all_confirmed:
             try:
@@ -161,8 +211,101 @@ async def _async_execute_trip_bookings(trip_id: str) -> None:
                     confirmation=confirmation,
                 )
             except Exception as exc:
-                import logging
-                logging.getLogger(__name__).warning("[booking_tasks] email step failed: %s", exc)
+                logger.warning("[booking_tasks] email step failed: %s", exc)
+
+    finally:
+        db.close()
+        # This task's event loop ends with asyncio.run(); shut the browser and
+        # the Stripe client down now
+        await browser_pool.close()
+        await virtual_card.close_client()
+
+
+def _save_outcomes(db, trip, updates: list[dict]) -> bool:
+    """
+    Write every booking outcome (bulk-update mappings keyed by id) plus the
+    trip status in one transaction. Returns True if every booking was confirmed.
+    """
+    from sqlalchemy import update
+
+    from app.models import Booking
+
+    all_confirmed = all(u["status"] == "confirmed" for u in updates)
+    db.execute(update(Booking), updates)
+    trip.status = "confirmed" if all_confirmed else "booking_failed"
+    db.commit()
+    return all_confirmed
+
+
+async def _book_one(
+    booking,
+    trip_id: str,
+    amount: float,
+    itinerary: dict,
+    traveler: dict,
+    user_id: str,
+    user_email: str,
+    cardholder_id: Optional[str],
+) -> dict:
+    """
+    Execute one booking end to end: a virtual card capped at amount, then the
+    agent run against itinerary. The card of a booking that fails is left for
+    the caller to void.
+
+    booking is the (id, type, details, priority) row claimed by the caller.
+    Nothing is written to the booking here — the return value is its final
+    state as a bulk-update mapping (id, status, and whichever of
+    virtual_card_id / confirmation_number / details changed), which the
+    caller commits together with the trip status.
+
+    Runs concurrently with the trip's other bookings, so the agent gets its
+    own Session — a Session must never be shared between concurrent tasks.
+    """
+    from app.database import SessionLocal
+    from app.services.booking_agent import BookingAgent, BookingNotSupported
+    from app.services.virtual_card import create_virtual_card
+
+    db = SessionLocal()
+    try:
+        virtual_card = None
+        try:
+            virtual_card = await create_virtual_card(
+                amount_usd=amount,
+                description=f"Trip {trip_id} — {booking.type}",
+                user_email=user_email,
+                cardholder_id=cardholder_id,
+            )
+
+            agent = BookingAgent(
+                booking_id=str(booking.id),
+                db=db,
+                priority=booking.priority,
+                user_id=user_id,
+            )
+            confirmation = await agent.run(
+                booking_type=booking.type,
+                itinerary=itinerary,
+                traveler=traveler,
+                virtual_card=virtual_card,
+            )
+
+            return {
+                "id": booking.id,
+                "status": "confirmed",
+                "virtual_card_id": virtual_card["card_id"],
+                "confirmation_number": confirmation,
+            }
+
+        except Exception as exc:
+            result = {
+                "id": booking.id,
+                "status": "unsupported" if isinstance(exc, BookingNotSupported) else "failed",
+                "details": {**(booking.details or {}), "error": str(exc)},
+            }
+            # The caller voids the card, if one was created
+            if virtual_card:
+                result["virtual_card_id"] = virtual_card["card_id"]
+            return result
 
     finally:
         db.close()
@@ -0,0 +1,40 @@
+"""
+Celery beat periodic task — database maintenance.
+
+agent_logs is range-partitioned by month (migration 010). Rows for a month
+with no partition fall into agent_logs_default, and once that happens the
+month's partition can no longer be attached cleanly. This task runs daily and
+makes sure the current and next month's partitions always exist ahead of
+inserts.
+"""
+
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+_ENSURE_PARTITION = text("SELECT ensure_agent_logs_partition(:for_date)")
+
+
+@celery_app.task(name="app.tasks.maintenance_tasks.ensure_agent_log_partitions")
+def ensure_agent_log_partitions() -> None:
+    from app.database import SessionLocal
+
+    this_month = date.today().replace(day=1)
+    next_month = (this_month + timedelta(days=32)).replace(day=1)
+
+    db = SessionLocal()
+    try:
+        for month in (this_month, next_month):
+            db.execute(_ENSURE_PARTITION, {"for_date": month})
+        db.commit()
+        logger.info("[maintenance] agent_logs partitions ensured through %s", next_month)
+    except Exception as exc:
+        db.rollback()
+        logger.error("[maintenance] partition check failed: %s", exc, exc_info=True)
+    finally:
+        db.close()
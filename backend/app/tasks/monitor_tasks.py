@@ -95,8 +95,6 @@ async def _async_scan_confirmed_trips() -> None:
 
             if new_alerts:
                 db.commit()
-                for alert in new_alerts:
-                    db.refresh(alert)
 
                 # Email user about new alerts (best-effort)
                 try:
@@ -0,0 +1,145 @@
+"""
+Celery task for trip search.
+
+POST /trips writes the Trip row (status "parsing") and returns 202 at once;
+search_trip_options(trip_id) then does the slow part:
+  1. Parses the plain-English request (Claude, or the rule-based fallback),
+     overlapping a speculative flight search with the Claude call.
+  2. Runs the flight, hotel and activity searches concurrently.
+  3. Builds 2-3 itinerary options and sets the trip status to
+     "options_ready", "search_failed" (no options) or "failed" (error).
+
+The frontend polls GET /trips/{id} until the status leaves parsing/searching.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.trip_tasks.search_trip_options")
+def search_trip_options(trip_id: str) -> None:
+    """Celery entry point — delegates to the async implementation."""
+    try:
+        asyncio.run(_async_search_trip_options(trip_id))
+    except Exception as exc:
+        logger.error("[trip_tasks] search failed for trip %s: %s", trip_id, exc, exc_info=True)
+
+
+def _flight_search_args(spec: dict) -> Optional[dict]:
+    """search_flights() kwargs for a parsed spec, or None if it can't be searched."""
+    origin = spec.get("origin")
+    destination = spec.get("destination")
+    depart_date = spec.get("depart_date")
+    if not (origin and destination and depart_date):
+        return None
+    return {
+        "origin": origin,
+        "destination": destination,
+        "depart_date": depart_date,
+        "return_date": spec.get("return_date"),
+        "adults": spec.get("num_travelers", 1) or 1,
+        "travel_class": spec.get("cabin_class", "ECONOMY") or "ECONOMY",
+    }
+
+
+async def _async_search_trip_options(trip_id: str) -> None:
+    from app.database import SessionLocal
+    from app.models import Trip
+    from app.services import amadeus, cache
+    from app.services.amadeus import search_activities, search_flights, search_hotels
+    from app.services.itinerary import build_itinerary_options
+    from app.services.trip_parser import parse_trip_request, parse_trip_request_fast
+
+    db = SessionLocal()
+    speculative_flights: Optional[asyncio.Task] = None
+    try:
+        trip = db.query(Trip).filter(Trip.id == trip_id).first()
+        if not trip:
+            return
+
+        # Speculative flight search: while Claude parses the request, start the
+        # flight search from the instant rule-based parse. It's reused only if
+        # Claude arrives at the same flight parameters; otherwise it's cancelled.
+        speculative_args: Optional[dict] = None
+        fast_spec = parse_trip_request_fast(trip.raw_request)
+        if fast_spec:
+            speculative_args = _flight_search_args(fast_spec)
+            if speculative_args:
+                speculative_flights = asyncio.create_task(search_flights(**speculative_args))
+
+        try:
+            parsed_spec = await parse_trip_request(trip.raw_request)
+            trip.parsed_spec = parsed_spec
+            trip.status = "searching"
+            db.commit()
+
+            destination = parsed_spec.get("destination")
+            depart_date = parsed_spec.get("depart_date")
+            return_date = parsed_spec.get("return_date")
+            num_travelers = parsed_spec.get("num_travelers", 1) or 1
+            budget_total = parsed_spec.get("budget_total")
+
+            # The three searches are independent I/O — run them concurrently so
+            # the task waits for the slowest one rather than the sum of all three
+            searches: dict = {}
+            flight_args = _flight_search_args(parsed_spec)
+            if flight_args:
+                if speculative_flights and flight_args == speculative_args:
+                    searches["flight"] = speculative_flights
+                    speculative_flights = None
+                else:
+                    searches["flight"] = asyncio.create_task(search_flights(**flight_args))
+            if destination and depart_date and return_date:
+                searches["hotel"] = asyncio.create_task(search_hotels(
+                    city_code=destination,
+                    check_in=depart_date,
+                    check_out=return_date,
+                    adults=num_travelers,
+                ))
+            if destination and depart_date:
+                searches["activity"] = asyncio.create_task(search_activities(
+                    city_code=destination,
+                    start_date=depart_date,
+                    end_date=return_date or depart_date,
+                    adults=num_travelers,
+                ))
+
+            results = await asyncio.gather(*searches.values(), return_exceptions=True)
+            offers: dict = {}
+            for kind, result in zip(searches, results):
+                if isinstance(result, Exception):
+                    logger.error("[trip_tasks] %s search error: %s", kind, result, exc_info=result)
+                    result = []
+                offers[kind] = result
+
+            options = build_itinerary_options(
+                flight_offers=offers.get("flight", []),
+                hotel_offers=offers.get("hotel", []),
+                budget_total=float(budget_total) if budget_total else None,
+                activity_offers=offers.get("activity", []),
+            )
+
+            trip.itinerary_options = options
+            trip.options_count = len(options)
+            trip.status = "options_ready" if options else "search_failed"
+            db.commit()
+
+        except Exception as exc:
+            db.rollback()
+            trip.status = "failed"
+            db.commit()
+            logger.error("[trip_tasks] trip %s processing failed: %s", trip_id, exc, exc_info=True)
+
+    finally:
+        # Guess didn't match (or the parse failed) — drop the speculative search
+        if speculative_flights:
+            speculative_flights.cancel()
+        db.close()
+        # This task's event loop ends with asyncio.run(); release its pools now
+        await amadeus.close_client()
+        await cache.close()
@@ -6,6 +6,7 @@ import { ItineraryCard } from "@/components/ItineraryCard"
 import { BookingStatus } from "@/components/BookingStatus"
 import { TripAlerts } from "@/components/TripAlerts"
 import { ModifyTrip } from "@/components/ModifyTrip"
+import { TripSearchProgress } from "@/components/TripSearchProgress"
 
 interface ParsedSpec {
   origin?: string
@@ -55,8 +56,6 @@ async function getTrip(id: string, email: string): Promise<Trip | null> {
 }
 
 const STATUS_MESSAGES: Record<string, string> = {
-  parsing:       "Parsing your trip request…",
-  searching:     "Searching for flights and hotels…",
   search_failed: "We couldn't find matching flights or hotels. Try adjusting your request.",
   failed:        "Something went wrong processing this trip.",
 }
@@ -135,11 +134,7 @@ export default async function TripPage({
 
         {/* In-progress parsing / searching */}
         {(trip.status === "parsing" || trip.status === "searching") && (
-          <div className="rounded-2xl border border-zinc-200 bg-white p-8 text-center shadow-sm">
-            <div className="w-8 h-8 border-2 border-zinc-900 border-t-transparent rounded-full animate-spin mx-auto mb-4" />
-            <p className="text-zinc-600">{STATUS_MESSAGES[trip.status]}</p>
-            <p className="text-xs text-zinc-400 mt-2">Refresh in a moment to see results.</p>
-          </div>
+          <TripSearchProgress tripId={trip.id} initialStatus={trip.status} />
         )}
 
         {/* Error states */}
@@ -0,0 +1,50 @@
+"use client"
+
+import { useEffect, useState } from "react"
+import { useRouter } from "next/navigation"
+
+interface Props {
+  tripId: string
+  initialStatus: string
+}
+
+const IN_PROGRESS = new Set(["parsing", "searching"])
+
+const MESSAGES: Record<string, string> = {
+  parsing:   "Parsing your trip request…",
+  searching: "Searching for flights and hotels…",
+}
+
+export function TripSearchProgress({ tripId, initialStatus }: Props) {
+  const router = useRouter()
+  const [status, setStatus] = useState(initialStatus)
+
+  // The search runs in a background worker — poll every 2 s until the trip
+  // leaves parsing/searching, then re-render the page with the results
+  useEffect(() => {
+    const interval = setInterval(async () => {
+      try {
+        const res = await fetch(`/api/trips/${tripId}`)
+        if (!res.ok) return
+        const data: { status: string } = await res.json()
+        setStatus(data.status)
+        if (!IN_PROGRESS.has(data.status)) {
+          clearInterval(interval)
+          router.refresh()
+        }
+      } catch {
+        // silently ignore poll errors
+      }
+    }, 2_000)
+
+    return () => clearInterval(interval)
+  }, [tripId, router])
+
+  return (
+    <div className="rounded-2xl border border-zinc-200 bg-white p-8 text-center shadow-sm">
+      <div className="w-8 h-8 border-2 border-zinc-900 border-t-transparent rounded-full animate-spin mx-auto mb-4" />
+      <p className="text-zinc-600">{MESSAGES[status] ?? MESSAGES.searching}</p>
+      <p className="text-xs text-zinc-400 mt-2">This usually takes a few seconds.</p>
+    </div>
+  )
+}